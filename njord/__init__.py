@@ -6,3 +6,5 @@ from .trades 	import Trades
 from .wallet	import Wallet
 from .window	import Window
 from .batch		import Batch
+from .dataset	import WindowDataset, ShardDataset
+from .cache		import Cache
@@ -1,10 +1,17 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import os
 import time
 import numpy
 import pandas
+import shutil
 import datetime
+import tempfile
+import threading
+
+from queue import Queue, Full
+from concurrent.futures import ProcessPoolExecutor
 
 
 class Batch:
@@ -12,28 +19,58 @@ class Batch:
 
 	:param root: the root dataset.
 	:type root: pandas dataframe.
+	:param symbols: the symbols of a multi-symbol root.
+	:type symbols: list<str>.
+	:param symbol_id: the symbol index of each sample of the last build.
+	:type symbol_id: numpy array.
 	:param data: the batch dataset.
 	:type data: pandas dataframe.
 	:param lk: the lookback horizon.
 	:type lk: int.
 	:param la: the lookahead horizon.
 	:type la: int.
+
+	.. note:: lk and la are stored as the shifts of the root, namely the 
+		lookback steps in descending order and the opposite of the 
+		lookahead steps.
 	"""
 
+	CHUNK = 4096
+
 	def __init__(self, root, lk, la):
 		"""Special method for class object construction.
 
-		:param root: the root dataset.
-		:type root: pandas dataframe.
-		:param lk: the lookback horizon.
-		:type lk: int.
-		:param la: the lookahead horizon.
-		:type la: int.
+		:param root: the root dataset, or the root dataset of each symbol
+			as a dict or as a dataframe with (symbol, column) columns.
+		:type root: pandas dataframe or dict(str, pandas dataframe).
+		:param lk: the lookback horizon, or the lookback steps.
+		:type lk: int or list<int>.
+		:param la: the lookahead horizon, or the lookahead steps.
+		:type la: int or list<int>.
 		"""
-		self.root = self._check_df(root)
+		self.symbols = None
+		self.symbol_id = None
+		self.root = self._check_root(root)
 		self.lk = self._check_lk(lk)
 		self.la = self._check_la(la)
 		self.data = None	
+		self._build = None
+		return
+
+	@property
+	def root(self):
+		"""The root dataset, the rows added by extend being concatenated 
+		on first access.
+		"""
+		if self._tail:
+			self._root = pandas.concat([self._root] + self._tail)
+			self._tail = []
+		return self._root
+
+	@root.setter
+	def root(self, root):
+		self._root = root
+		self._tail = []
 		return
 
 	def __repr__(self):
@@ -67,25 +104,129 @@ class Batch:
 		df.index = pandas.to_datetime(df.index)		
 		return df
 
+	def _check_root(self, root):
+		"""Check the root, and align the roots of the symbols on time.
+
+		The roots of the symbols are outer joined, such that the rows of a 
+		symbol keep their steps: the rows missing for a symbol are nans, 
+		whose samples are dropped by get_rows.
+		"""
+		if isinstance(root, dict):
+			roots = {}
+			for symbol, df in root.items():
+				roots[symbol] = self._check_df(df)
+			columns = [list(df.columns) for df in roots.values()]
+			if any(item != columns[0] for item in columns):
+				raise ValueError("Please provide roots with the same columns.")
+			root = pandas.concat(roots, axis=1, join="outer").sort_index()
+			root.index.name = "time"
+		else:
+			root = self._check_df(root)
+		if isinstance(root.columns, pandas.MultiIndex):
+			self.symbols = list(root.columns.get_level_values(0).unique())
+		return root
+
+	def _get_values(self, target, symbol=None):
+		"""Returns the root and target values, of a symbol for a 
+		multi-symbol root.
+		"""
+		root = self.root if symbol is None else self.root[symbol]
+		values = root.values.astype(numpy.float64, copy=False)
+		tvalues = root.loc[:,target].values.astype(numpy.float64, copy=False)
+		return values, tvalues
+
 	def _check_lk(self, lk):
 		"""Check the lookback horizon.
+
+		An int lk sets the contiguous steps 0 to lk-1, a list sets the 
+		steps explicitly, such as [0, 1, 2, 4, 8, 16, 32, 64, 144].
 		"""
 		if isinstance(lk, int):
 			return list(range(0,lk))[::-1]
+		elif isinstance(lk, (list, tuple)) and len(lk) > 0:
+			if not all(isinstance(k, int) and k >= 0 for k in lk):
+				raise ValueError("Please provide lookback steps as int >= 0.")
+			return sorted(set(lk))[::-1]
 		else:
 			raise TypeError()
 
 	def _check_la(self, la):
 		"""Check the lookahead horizon.
+
+		An int la sets the contiguous steps 1 to la, a list sets the 
+		steps explicitly, such as [1, 2, 4, 8] or Batch.geometric(8, start=1).
 		"""
 		if isinstance(la, int):
 			index = []
 			for i in range(1, la+1):
 				index.append(-i)
 			return index
+		elif isinstance(la, (list, tuple)) and len(la) > 0:
+			if not all(isinstance(k, int) and k >= 1 for k in la):
+				raise ValueError("Please provide lookahead steps as int >= 1.")
+			return [-k for k in sorted(set(la))]
 		else:
 			raise TypeError()
 
+	@staticmethod
+	def dilated(length, dilation, start=0):
+		"""Returns dilated steps.
+
+		:param length: the horizon, in number of root rows.
+		:type length: int.
+		:param dilation: the number of rows between two steps.
+		:type dilation: int.
+		:param start: the first step, 1 for lookahead steps (optional).
+		:type start: int.
+
+		:return: the steps start, start + dilation, ... below length.
+		:rtype: list<int>.
+
+		.. note:: the step 0 is the current row, which is not a lookahead 
+			step: use Batch(root, lk=Batch.dilated(64, 4), 
+			la=Batch.dilated(16, 4, start=1)).
+		"""
+		return list(range(start, length, dilation))
+
+	@staticmethod
+	def geometric(length, base=2, start=0):
+		"""Returns geometric steps.
+
+		:param length: the horizon, in number of root rows.
+		:type length: int.
+		:param base: the ratio between two steps (optional).
+		:type base: int.
+		:param start: the first step, 1 for lookahead steps (optional).
+		:type start: int.
+
+		:return: the steps start, then 1, base, base**2, ... above start and 
+			below length, and length.
+		:rtype: list<int>.
+
+		.. note:: the step 0 is the current row, which is not a lookahead 
+			step: use Batch(root, lk=Batch.geometric(64), 
+			la=Batch.geometric(16, start=1)).
+		"""
+		steps = [start]
+		step = 1
+		while step < length:
+			if step > start:
+				steps.append(step)
+			step *= base
+		if length > start:
+			steps.append(length)
+		return steps
+
+	def _get_lk_max(self):
+		"""Returns the largest lookback step.
+		"""
+		return max(self.lk)
+
+	def _get_la_max(self):
+		"""Returns the largest lookahead step.
+		"""
+		return -min(self.la)
+
 	def sign(self, df, marker):
 		"""Sign the dataframe columns with a marker.
 
@@ -121,20 +262,239 @@ class Batch:
 				columns.append(col)
 		return df.loc[:,columns]
 
-	def build(self, target=None, method="pvt"):
+	def _check_target(self, target):
+		"""Check the target and returns it as a list of columns.
+		"""
+		if target is None and self.symbols is not None:
+			target = list(self.root[self.symbols[0]].columns)
+		elif target is None:
+			target = list(self.root.columns)
+		elif isinstance(target, str):
+			target = [target]
+		else:
+			pass
+		return target
+
+	def build(self, target=None, method="pvt", engine="numpy", cache=None,
+		workers=None, categories=None, dtype=numpy.float64):
 		"""Build and return the batch.
+
+		:param target: the target column(s) (optional).
+		:type target: str or list<str>.
+		:param method: the normalisation method, 'pvt', 'pct' or None (optional).
+		:type method: str.
+		:param engine: the build engine, 'numpy' or 'pandas' (optional).
+		:type engine: str.
+		:param cache: the cache of built datasets (optional).
+		:type cache: Cache.
+		:param workers: the number of processes of the numpy engine (optional).
+		:type workers: int.
+		:param categories: the bin edges of the target categories, or the 
+			(lower_bound, upper_bound) of each category (optional).
+		:type categories: list<float> or tuple(tuple(float, float), ...).
+		:param dtype: the dtype of the batch, such as numpy.float32 (optional).
+		:type dtype: numpy dtype.
+
+		:return X: the features.
+		:rtype X: numpy array of shape (m, lk, n).
+		:return Y: the targets, or their categories.
+		:rtype Y: numpy array of shape (m, la, n_target).
+
+		.. note:: for a multi-symbol root, the samples are stacked by symbol
+			and the symbol index of each sample is set as symbol_id.
+		"""
+		edges = self.get_edges(categories)
+		if self.symbols is not None and (engine != "numpy" or (
+			workers is not None and workers > 1)):
+			raise ValueError("Please build multi-symbol roots with the serial numpy engine.")
+
+		# Check the cache.
+		if cache is not None:
+			key = cache.key(self.root, lk=self.lk, la=self.la,
+				target=self._check_target(target), method=method, engine=engine,
+				categories=edges, dtype=numpy.dtype(dtype).name)
+			data = cache.get(key)
+			if data is not None:
+				if self.symbols is not None:
+					self.symbol_id = self._get_symbol_id(target, method)
+				self._set_build(data[0], data[1], target, method, edges)
+				return data
+
+		# Build the batch.
+		if engine == "numpy" and workers is not None and workers > 1:
+			X, Y = self._build_parallel(target, method, workers, dtype)
+		elif engine == "numpy":
+			X, Y = self._build_numpy(target, method, dtype)
+		elif engine == "pandas":
+			X, Y = self._build_pandas(target, method)
+			X = X.astype(dtype, copy=False)
+			Y = Y.astype(dtype, copy=False)
+		else:
+			raise ValueError("Unsupported engine {}".format(engine))
+
+		# Set the target categories.
+		if edges is not None:
+			Y = numpy.digitize(Y, edges)
+
+		# Store the batch.
+		if cache is not None:
+			cache.set(key, X, Y)
+		self._set_build(X, Y, target, method, edges)
+
+		return X, Y
+
+	def _set_build(self, X, Y, target, method, edges=None):
+		"""Set the built batch as the buffers to be extended.
+		"""
+		self._build = {
+			"X": X,
+			"Y": Y,
+			"size": len(X),
+			"target": self._check_target(target),
+			"method": method,
+			"edges": edges,
+			"length": len(self.root)}
+		return
+
+	@staticmethod
+	def get_edges(categories):
+		"""Returns the bin edges of the categories.
+
+		:param categories: the bin edges, or the (lower_bound, upper_bound)
+			of each category.
+		:type categories: list<float> or tuple(tuple(float, float), ...).
+
+		:return: the sorted finite bin edges, or None.
+		:rtype: numpy array.
+		"""
+		if categories is None:
+			return None
+		edges = numpy.asarray(categories, dtype=numpy.float64).ravel()
+		edges = numpy.unique(edges[numpy.isfinite(edges)])
+		if len(edges) == 0:
+			raise ValueError("Please provide consistent categories.")
+		return edges
+
+	@staticmethod
+	def balance(labels, size=None, seed=None):
+		"""Returns sample indices balanced across the categories.
+
+		Each category is drawn the same number of times, without replacement 
+		if it holds enough samples. Only indices are returned, the batch 
+		is not duplicated.
+
+		:param labels: the category of each sample.
+		:type labels: numpy array of shape (m,).
+		:param size: the number of indices, by default the number of 
+			categories times the size of the smallest one (optional).
+		:type size: int.
+		:param seed: the seed of the draw (optional).
+		:type seed: int.
+
+		:return: the shuffled indices.
+		:rtype: numpy array.
+		"""
+		rng = numpy.random.default_rng(seed)
+		classes, inverse, counts = numpy.unique(numpy.asarray(labels), 
+			return_inverse=True, return_counts=True)
+		if size is None:
+			count = counts.min()
+		else:
+			count = -(-size // len(classes))
+		order = numpy.argsort(inverse, kind="stable")
+		bounds = numpy.concatenate([[0], numpy.cumsum(counts)])
+		index = []
+		for i in range(len(classes)):
+			members = order[bounds[i]:bounds[i+1]]
+			index.append(rng.choice(members, count, replace=count > len(members)))
+		index = rng.permutation(numpy.concatenate(index))
+		if size is not None:
+			index = index[:size]
+		return index
+
+	def extend(self, rows):
+		"""Extend the root with new rows and the built batch with the
+		samples that become valid.
+
+		Only the new samples are computed: the new rows as features and the
+		rows whose look-ahead is now filled as targets. They are written to
+		buffers that grow geometrically, as are the root values, such that
+		only the new rows are copied.
+
+		:param rows: the new rows of the root.
+		:type rows: pandas dataframe.
+
+		:return X: the features.
+		:rtype X: numpy array of shape (m, lk, n).
+		:return Y: the targets.
+		:rtype Y: numpy array of shape (m, la, n_target).
+		"""
+		if self._build is None:
+			raise ValueError("Please build the batch before extending it.")
+		if self.symbols is not None:
+			raise ValueError("Multi-symbol batches can not be extended.")
+		build = self._build
+
+		# Extend the root values, in buffers that grow geometrically.
+		rows = self._check_df(rows)
+		if list(rows.columns) != list(self._root.columns):
+			raise ValueError("Please provide rows consistent with the root.")
+		if "values" not in build:
+			build["values"] = self.root.values.astype(numpy.float64)
+			build["tvalues"] = self.root.loc[:,build["target"]].values.astype(numpy.float64)
+		length = build["length"] + len(rows)
+		if length > len(build["values"]):
+			capacity = max(length, 2 * len(build["values"]))
+			for key in ("values", "tvalues"):
+				data = numpy.empty((capacity,) + build[key].shape[1:])
+				data[:build["length"]] = build[key][:build["length"]]
+				build[key] = data
+		build["values"][build["length"]:length] = rows.values
+		build["tvalues"][build["length"]:length] = rows.loc[:,build["target"]].values
+		self._tail.append(rows)
+
+		# Get the values of the rows whose samples can change.
+		start = max(build["length"] - self._get_la_max() - self._get_lk_max() - 2, 0)
+		values = build["values"][start:length]
+		tvalues = build["tvalues"][start:length]
+		build["length"] = length
+
+		# Get the new valid rows.
+		index = self.get_rows(values, tvalues, build["method"])
+		index = index[index + start >= length - len(rows) - self._get_la_max()]
+
+		# Grow the buffers.
+		size = build["size"] + len(index)
+		if size > len(build["X"]):
+			capacity = max(size, 2 * len(build["X"]))
+			for key in ("X", "Y"):
+				data = numpy.empty((capacity,) + build[key].shape[1:], 
+					dtype=build[key].dtype)
+				data[:build["size"]] = build[key][:build["size"]]
+				build[key] = data
+
+		# Fill the new samples.
+		if build["edges"] is None:
+			self.fill(values, tvalues, index, build["method"],
+				build["X"][build["size"]:size], build["Y"][build["size"]:size])
+		else:
+			Y = numpy.empty((len(index),) + build["Y"].shape[1:])
+			self.fill(values, tvalues, index, build["method"],
+				build["X"][build["size"]:size], Y)
+			build["Y"][build["size"]:size] = numpy.digitize(Y, build["edges"])
+		build["size"] = size
+
+		return build["X"][:size], build["Y"][:size]
+
+	def _build_pandas(self, target, method):
+		"""Build and return the batch from shifted dataframes.
 		"""
 
 		# Initialise an empty batch.
 		batch = []
 
 		# Check the target.
-		if target is None:
-			target = list(self.root.columns)
-		elif isinstance(target, str):
-			target = [target]
-		else:
-			pass
+		target = self._check_target(target)
 		
 		# Set the features.
 		for lk in self.lk:
@@ -193,3 +553,393 @@ class Batch:
 		Y = Y.reshape(m, len(self.la), int(n/len(self.la)))	
 
 		return X, Y
+
+	def _build_numpy(self, target, method, dtype=numpy.float64):
+		"""Build and return the batch by gathering the steps of the root.
+
+		The samples of a multi-symbol root are stacked by symbol into
+		the same batch.
+		"""
+
+		# Get the valid rows of each symbol.
+		target = self._check_target(target)
+		symbols = [None] if self.symbols is None else self.symbols
+		data = []
+		rows = []
+		for symbol in symbols:
+			values, tvalues = self._get_values(target, symbol)
+			data.append((values, tvalues))
+			rows.append(self.get_rows(values, tvalues, method))
+
+		# Allocate the batch.
+		size = sum(len(item) for item in rows)
+		X = numpy.empty((size, len(self.lk), values.shape[1]), dtype=dtype)
+		Y = numpy.empty((size, len(self.la), tvalues.shape[1]), dtype=dtype)
+
+		# Fill the batch by chunks of rows.
+		j = 0
+		for (values, tvalues), index in zip(data, rows):
+			for i in range(0, len(index), self.CHUNK):
+				chunk = index[i:i+self.CHUNK]
+				self.fill(values, tvalues, chunk, method,
+					X[j:j+len(chunk)], Y[j:j+len(chunk)])
+				j += len(chunk)
+
+		# Set the symbol index of the samples.
+		if self.symbols is not None:
+			self.symbol_id = numpy.repeat(numpy.arange(len(symbols)), 
+				[len(item) for item in rows])
+
+		return X, Y
+
+	def _get_symbol_id(self, target, method):
+		"""Returns the symbol index of the samples of a multi-symbol root.
+		"""
+		target = self._check_target(target)
+		counts = []
+		for symbol in self.symbols:
+			values, tvalues = self._get_values(target, symbol)
+			counts.append(len(self.get_rows(values, tvalues, method)))
+		return numpy.repeat(numpy.arange(len(self.symbols)), counts)
+
+	def splits(self, n_splits, test=None, val=0, train=None, purge=None,
+		embargo=None):
+		"""Yield walk-forward splits of the built batch.
+
+		The splits are slices over the samples, such that X[train] and 
+		Y[train] are views of the built batch. The test sets of the splits 
+		are consecutive and end with the batch. The train set is expanding 
+		from the first sample, or rolling if its size is given. Between two 
+		sets, the samples whose look-ahead overlaps the next set are purged 
+		and the samples whose look-back overlaps it are embargoed, such that
+		the validation set ends purge plus embargo samples before the test
+		set, and the train set ends purge plus embargo samples before the 
+		validation set.
+
+		:param n_splits: the number of splits.
+		:type n_splits: int.
+		:param test: the number of test samples (optional).
+		:type test: int.
+		:param val: the number of validation samples (optional).
+		:type val: int.
+		:param train: the number of train samples of a rolling split (optional).
+		:type train: int.
+		:param purge: the number of purged samples, the largest lookahead 
+			step by default (optional).
+		:type purge: int.
+		:param embargo: the number of embargoed samples, the largest lookback
+			step plus one by default (optional).
+		:type embargo: int.
+
+		:return: the train, validation and test slices.
+		:rtype: generator of tuple(slice, slice, slice).
+
+		.. note:: the samples of a multi-symbol batch are stacked by symbol 
+			rather than by time, split the batch of each symbol instead.
+		"""
+		if self._build is None:
+			raise ValueError("Please build the batch before splitting it.")
+		if self.symbols is not None:
+			raise ValueError("Multi-symbol batches are stacked by symbol and can not be split on time.")
+		size = self._build["size"]
+		if purge is None:
+			purge = self._get_la_max()
+		if embargo is None:
+			embargo = self._get_lk_max() + 1
+		if test is None:
+			test = size // (n_splits + 1)
+		gap = purge + embargo
+
+		for k in range(n_splits):
+			test_start = size - (n_splits - k) * test
+			if val > 0:
+				val_start = test_start - gap - val
+				stop = val_start - gap
+			else:
+				val_start = test_start
+				stop = test_start - gap
+			if train is None:
+				start = 0
+			else:
+				start = stop - train
+			if start < 0 or stop <= start:
+				raise ValueError("Please provide consistent split sizes.")
+			yield (slice(start, stop), 
+				slice(val_start, val_start + val), 
+				slice(test_start, test_start + test))
+
+		return
+
+	def _build_parallel(self, target, method, workers, dtype=numpy.float64):
+		"""Build and return the batch from time chunks of the root, 
+		in a pool of processes.
+
+		Each chunk of the root overlaps the previous one by the look-back 
+		and look-ahead rows, and its samples are written by the worker into 
+		a shared memory-mapped batch.
+		"""
+
+		# Get the root and target values.
+		target = self._check_target(target)
+		values, tvalues = self._get_values(target)
+
+		# Get the valid rows and allocate the memory-mapped batch.
+		rows = self.get_rows(values, tvalues, method)
+		directory = tempfile.mkdtemp(prefix="njord_")
+		paths = (os.path.join(directory, "X.npy"), os.path.join(directory, "Y.npy"))
+		numpy.lib.format.open_memmap(paths[0], mode="w+", dtype=dtype,
+			shape=(len(rows), len(self.lk), values.shape[1]))
+		numpy.lib.format.open_memmap(paths[1], mode="w+", dtype=dtype,
+			shape=(len(rows), len(self.la), tvalues.shape[1]))
+
+		try:
+
+			# Fill the batch by time chunks.
+			size = max(-(-len(rows) // (4 * workers)), 1)
+			with ProcessPoolExecutor(max_workers=workers) as executor:
+				futures = []
+				for i in range(0, len(rows), size):
+					index = rows[i:i+size]
+					start = max(index[0] - self._get_lk_max() - 1, 0)
+					stop = index[-1] + self._get_la_max() + 1
+					futures.append(executor.submit(_fill_chunk, self.lk, self.la,
+						values[start:stop], tvalues[start:stop], index - start,
+						method, paths, i))
+				for future in futures:
+					future.result()
+
+			# Load the batch.
+			X = numpy.load(paths[0])
+			Y = numpy.load(paths[1])
+
+		finally:
+			shutil.rmtree(directory, ignore_errors=True)
+
+		return X, Y
+
+	def batches(self, batch_size, target=None, method="pvt", shuffle=True,
+		seed=None, prefetch=2, categories=None, dtype=numpy.float64):
+		"""Yield mini-batches of the batch, built on demand.
+
+		Only the root values and the valid rows are kept in memory, the 
+		mini-batches are built by a background thread ahead of their use.
+
+		:param batch_size: the number of samples per mini-batch.
+		:type batch_size: int.
+		:param target: the target column(s) (optional).
+		:type target: str or list<str>.
+		:param method: the normalisation method, 'pvt', 'pct' or None (optional).
+		:type method: str.
+		:param shuffle: shuffle the samples (optional).
+		:type shuffle: bool.
+		:param seed: the seed of the shuffle (optional).
+		:type seed: int.
+		:param prefetch: the number of mini-batches built ahead, 0 to build
+			them in the calling thread (optional).
+		:type prefetch: int.
+		:param categories: the bin edges of the target categories, or the 
+			(lower_bound, upper_bound) of each category (optional).
+		:type categories: list<float> or tuple(tuple(float, float), ...).
+		:param dtype: the dtype of the mini-batches (optional).
+		:type dtype: numpy dtype.
+
+		:return: the features and targets of shapes (batch_size, lk, n) 
+			and (batch_size, la, n_target).
+		:rtype: generator of tuple(numpy array, numpy array).
+		"""
+
+		# Get the root and target values.
+		if self.symbols is not None:
+			raise ValueError("Multi-symbol batches are built with build only.")
+		target = self._check_target(target)
+		values, tvalues = self._get_values(target)
+
+		# Get the valid rows.
+		rows = self.get_rows(values, tvalues, method)
+		edges = self.get_edges(categories)
+		if shuffle:
+			rows = numpy.random.default_rng(seed).permutation(rows)
+
+		def build(index):
+			X = numpy.empty((len(index), len(self.lk), values.shape[1]), dtype=dtype)
+			Y = numpy.empty((len(index), len(self.la), tvalues.shape[1]), dtype=dtype)
+			self.fill(values, tvalues, index, method, X, Y)
+			if edges is not None:
+				Y = numpy.digitize(Y, edges)
+			return X, Y
+
+		# Build the mini-batches in the calling thread.
+		if prefetch < 1:
+			for i in range(0, len(rows), batch_size):
+				yield build(rows[i:i+batch_size])
+			return
+
+		# Build the mini-batches in a background thread.
+		queue = Queue(maxsize=prefetch)
+		stop = threading.Event()
+
+		def put(item):
+			while not stop.is_set():
+				try:
+					queue.put(item, timeout=0.1)
+					return True
+				except Full:
+					pass
+			return False
+
+		def produce():
+			try:
+				for i in range(0, len(rows), batch_size):
+					if not put(build(rows[i:i+batch_size])):
+						return
+				put(None)
+			except Exception as error:
+				put(error)
+			return
+
+		thread = threading.Thread(target=produce, daemon=True)
+		thread.start()
+		try:
+			while True:
+				item = queue.get()
+				if item is None:
+					break
+				if isinstance(item, Exception):
+					raise item
+				yield item
+		finally:
+			stop.set()
+			thread.join()
+		return
+
+	def get_rows(self, values, tvalues, method):
+		"""Returns the root rows for which a sample can be built.
+
+		A row is valid if the rows of its look-back and look-ahead steps 
+		are in the root and free of nans, as the pandas engine drops them.
+
+		:param values: the root values.
+		:type values: numpy array of shape (T, n).
+		:param tvalues: the target values.
+		:type tvalues: numpy array of shape (T, n_target).
+		:param method: the normalisation method.
+		:type method: str.
+
+		:return: the rows.
+		:rtype: numpy array.
+		"""
+		lk = numpy.asarray(self.lk)
+		la = -numpy.asarray(self.la)
+		if method == "pct":
+			lk = numpy.union1d(lk, lk + 1)
+			la = numpy.union1d(la, la - 1)
+		elif method == "pvt":
+			lk = numpy.union1d(lk, [0])
+			la = numpy.union1d(la, [0])
+		rows = numpy.arange(lk.max(), len(values) - la.max())
+
+		# Check the rows with nans at the look-back and look-ahead steps.
+		nans = numpy.isnan(values).any(axis=1)
+		tnans = numpy.isnan(tvalues).any(axis=1)
+		valid = numpy.ones(len(rows), dtype=bool)
+		for k in lk:
+			valid &= ~nans[rows-k]
+		for k in la:
+			valid &= ~tnans[rows+k]
+
+		return rows[valid]
+
+	def _take(self, data, index):
+		"""Returns the data at index, as a view if the index is increasing
+		by one, such as the rows of an unshuffled chunk.
+		"""
+		if len(index) > 0 and numpy.all(numpy.diff(index) == 1):
+			return data[index[0]:index[-1]+1]
+		return data[index]
+
+	def fill(self, values, tvalues, rows, method, X, Y):
+		"""Fill the features and targets for the specified rows.
+
+		The steps of all the rows are gathered at once in X and Y, 
+		which are then normalised in place. If X or Y is not float64, 
+		the rows are normalised in float64 before being cast in place.
+
+		:param values: the root values.
+		:type values: numpy array of shape (T, n).
+		:param tvalues: the target values.
+		:type tvalues: numpy array of shape (T, n_target).
+		:param rows: the rows of the samples.
+		:type rows: numpy array of shape (m,).
+		:param method: the normalisation method.
+		:type method: str.
+		:param X: the features to fill.
+		:type X: numpy array of shape (m, lk, n).
+		:param Y: the targets to fill.
+		:type Y: numpy array of shape (m, la, n_target).
+		"""
+		if X.dtype != numpy.float64 or Y.dtype != numpy.float64:
+			for i in range(0, len(rows), self.CHUNK):
+				index = rows[i:i+self.CHUNK]
+				x = numpy.empty((len(index),) + X.shape[1:])
+				y = numpy.empty((len(index),) + Y.shape[1:])
+				self.fill(values, tvalues, index, method, x, y)
+				X[i:i+len(index)] = x
+				Y[i:i+len(index)] = y
+			return
+
+		index = rows[:,None] - numpy.asarray(self.lk)[None,:]
+		tindex = rows[:,None] - numpy.asarray(self.la)[None,:]
+
+		# Set the features.
+		numpy.take(values, index, axis=0, out=X)
+		if method == "pvt":
+			X /= self._take(values, rows)[:,None,:]
+			X -= 1.0
+		elif method == "pct":
+			X /= values[index-1]
+			X -= 1.0
+
+		# Set the targets.
+		numpy.take(tvalues, tindex, axis=0, out=Y)
+		if method == "pvt":
+			Y /= self._take(tvalues, rows)[:,None,:]
+			Y -= 1.0
+		elif method == "pct":
+			Y /= tvalues[tindex-1]
+			Y -= 1.0
+
+		return
+
+def _fill_chunk(lk, la, values, tvalues, rows, method, paths, offset):
+	"""Fill the memory-mapped batch with the samples of a chunk of the root.
+
+	:param lk: the lookback horizon.
+	:type lk: list<int>.
+	:param la: the lookahead horizon.
+	:type la: list<int>.
+	:param values: the chunk values.
+	:type values: numpy array.
+	:param tvalues: the chunk target values.
+	:type tvalues: numpy array.
+	:param rows: the rows of the samples in the chunk.
+	:type rows: numpy array.
+	:param method: the normalisation method.
+	:type method: str.
+	:param paths: the paths of the memory-mapped features and targets.
+	:type paths: tuple(str, str).
+	:param offset: the index of the first sample in the batch.
+	:type offset: int.
+	"""
+	batch = Batch.__new__(Batch)
+	batch.lk = lk
+	batch.la = la
+	X = numpy.load(paths[0], mmap_mode="r+")
+	Y = numpy.load(paths[1], mmap_mode="r+")
+	for i in range(0, len(rows), Batch.CHUNK):
+		index = rows[i:i+Batch.CHUNK]
+		j = offset + i
+		batch.fill(values, tvalues, index, method,
+			X[j:j+len(index)], Y[j:j+len(index)])
+	X.flush()
+	Y.flush()
+	return
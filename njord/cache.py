@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import json
+import numpy
+import pandas
+import hashlib
+
+
+class Cache():
+	"""Class that handles a content-addressed on-disk cache of datasets.
+
+	A dataset is keyed by a hash of its root dataframe and of its build
+	parameters. The features and targets are stored as '.npy' files and
+	reopened as memory-mapped arrays. The least recently used datasets are
+	evicted when the size of the cache exceeds its limit.
+
+	:attr directory: the cache directory.
+	:type directory: str.
+	:attr maxsize: the maximum size of the cache in bytes.
+	:type maxsize: int.
+	"""
+
+	NAMES = ("X", "Y")
+
+	def __init__(self, directory, maxsize=4.0E+9):
+		"""Special method for class object construction.
+
+		:param directory: the cache directory.
+		:type directory: str.
+		:param maxsize: the maximum size of the cache in bytes (optional).
+		:type maxsize: int.
+		"""
+		self.directory = directory
+		self.maxsize = maxsize
+		os.makedirs(self.directory, exist_ok=True)
+		return
+
+	def __repr__(self):
+		"""Special method for class object representation.
+		"""
+		_repr = {
+			"directory": self.directory,
+			"maxsize": self.maxsize,
+			"size": self.size()}
+		return _repr
+
+	def __str__(self):
+		"""Special method for class object printable version.
+		"""
+		_str = []
+		for key, item in self.__repr__().items():
+			_str.append("{} = {}".format(key, item))
+		return "{}({})".format(self.__class__.__name__, ", ".join(_str))
+
+	def __contains__(self, key):
+		"""Special method for class object membership test.
+		"""
+		return all(os.path.exists(self._path(key, name)) for name in self.NAMES)
+
+	def _path(self, key, name):
+		"""Returns the path of a cached array.
+		"""
+		return os.path.join(self.directory, "{}_{}.npy".format(key, name))
+
+	def key(self, root, **params):
+		"""Returns the key of a dataset.
+
+		:param root: the root dataframe.
+		:type root: pandas dataframe.
+		:param params: the build parameters.
+		:type params: dict.
+
+		:return: the key.
+		:rtype: str.
+		"""
+		sha = hashlib.sha1()
+		sha.update(pandas.util.hash_pandas_object(root, index=True).values.tobytes())
+		sha.update(json.dumps([str(column) for column in root.columns]).encode())
+		sha.update(json.dumps(params, sort_keys=True, default=str).encode())
+		return sha.hexdigest()
+
+	def get(self, key):
+		"""Returns the cached dataset, or None if it is not cached.
+
+		:param key: the key of the dataset.
+		:type key: str.
+
+		:return: the memory-mapped features and targets.
+		:rtype: tuple(numpy memmap, numpy memmap).
+		"""
+		if key not in self:
+			return None
+		data = []
+		for name in self.NAMES:
+			path = self._path(key, name)
+			os.utime(path)
+			data.append(numpy.load(path, mmap_mode="r"))
+		return tuple(data)
+
+	def set(self, key, X, Y):
+		"""Store the dataset and evict the least recently used ones.
+
+		:param key: the key of the dataset.
+		:type key: str.
+		:param X: the features.
+		:type X: numpy array.
+		:param Y: the targets.
+		:type Y: numpy array.
+		"""
+		for name, data in zip(self.NAMES, (X, Y)):
+			path = self._path(key, name)
+			numpy.save(path + ".tmp.npy", data)
+			os.replace(path + ".tmp.npy", path)
+		self.evict(keep=key)
+		return
+
+	def _entries(self):
+		"""Returns the cached datasets as a dict of key: (atime, size).
+		"""
+		entries = {}
+		for filename in os.listdir(self.directory):
+			if not filename.endswith(".npy") or ".tmp" in filename:
+				continue
+			key = filename.rsplit("_", 1)[0]
+			stat = os.stat(os.path.join(self.directory, filename))
+			atime, size = entries.get(key, (0.0, 0))
+			entries[key] = (max(atime, stat.st_mtime), size + stat.st_size)
+		return entries
+
+	def size(self):
+		"""Returns the size of the cache in bytes.
+		"""
+		return sum(size for _, size in self._entries().values())
+
+	def evict(self, keep=None):
+		"""Remove the least recently used datasets until the size
+		of the cache is within its limit.
+
+		:param keep: the key of a dataset to keep (optional).
+		:type keep: str.
+		"""
+		entries = self._entries()
+		size = sum(item[1] for item in entries.values())
+		for key in sorted(entries, key=lambda key: entries[key][0]):
+			if size <= self.maxsize:
+				break
+			if key == keep:
+				continue
+			for name in self.NAMES:
+				try:
+					os.remove(self._path(key, name))
+				except FileNotFoundError:
+					pass
+			size -= entries[key][1]
+		return
+
+	def clear(self):
+		"""Remove all the cached datasets.
+		"""
+		for key in self._entries():
+			for name in self.NAMES:
+				try:
+					os.remove(self._path(key, name))
+				except FileNotFoundError:
+					pass
+		return
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import copy
+import json
+import numpy
+import shutil
+import weakref
+import tempfile
+
+
+class WindowDataset():
+	"""Class that handles a map-style dataset of windows over a history.
+
+	The history values are written once to a memory-mapped array, such that
+	the dataset can be shared by the workers of a torch DataLoader. The sample
+	i is the normalised window ending at the row i + lookback together with
+	the percentage change of the targets over the look-ahead steps. A root 
+	written to a temporary file is removed by close, at the exit of a with
+	block, or when the dataset is garbage collected.
+
+	:attr window: the window defining the look-back and the normalisation.
+	:type window: Window.
+	:attr lookahead: the look-ahead horizon of the targets.
+	:type lookahead: int.
+	:attr target: the column indices of the targets.
+	:type target: list<int>.
+	:attr path: the path of the memory-mapped root.
+	:type path: str.
+	:attr root: the memory-mapped root.
+	:type root: numpy memmap of shape (length, collen).
+	"""
+
+	def __init__(self, window, history, target=None, lookahead=1, path=None):
+		"""Special method for class object construction.
+
+		:param window: the window, with its normalisation methods, copied
+			such that its columns are set on the copy only.
+		:type window: Window.
+		:param history: the history.
+		:type history: History.
+		:param target: the name(s) of the target columns (optional).
+		:type target: str or list<str>.
+		:param lookahead: the look-ahead horizon (optional).
+		:type lookahead: int.
+		:param path: the file of the memory-mapped root (optional).
+		:type path: str.
+		"""
+		if window.periods:
+			raise ValueError("Multi-resolution windows are not supported.")
+		self.window = copy.deepcopy(window)
+		self.window.check_schema(list(history.columns), len(history.columns))
+		self.lookahead = lookahead
+		self.target = self._check_target(target)
+
+		# Write the root to the memory-mapped file.
+		self._tmpdir = None
+		self._finalizer = None
+		if path is None:
+			self._tmpdir = tempfile.mkdtemp(prefix="njord_")
+			self._finalizer = weakref.finalize(self, shutil.rmtree, 
+				self._tmpdir, ignore_errors=True)
+			path = os.path.join(self._tmpdir, "root.npy")
+		self.path = path
+		root = numpy.lib.format.open_memmap(self.path, mode="w+",
+			dtype=numpy.float64, shape=history.df.shape)
+		root[:] = history.df.values
+		root.flush()
+		del root
+		self.root = numpy.load(self.path, mmap_mode="r")
+		return
+
+	def __repr__(self):
+		"""Special method for class object representation.
+		"""
+		_repr = {
+			"window": self.window,
+			"lookahead": self.lookahead,
+			"target": self.target,
+			"path": self.path,
+			"length": self.__len__()}
+		return _repr
+
+	def __str__(self):
+		"""Special method for class object printable version.
+		"""
+		_str = []
+		for key, item in self.__repr__().items():
+			_str.append("{} = {}".format(key, item))
+		return "{}({})".format(self.__class__.__name__, ", ".join(_str))
+
+	def __len__(self):
+		"""Special method for class object length.
+		"""
+		return max(len(self.root) - self.window.lookback - self.lookahead, 0)
+
+	def __enter__(self):
+		"""Special method for the with statement entry.
+		"""
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		"""Special method for the with statement exit, closes the dataset.
+		"""
+		self.close()
+		return False
+
+	def __getitem__(self, index):
+		"""Special method for class object item accessibility.
+
+		:param index: the index of the sample.
+		:type index: int.
+
+		:return: the window of shape (lookback, collen) and the
+			target of shape (lookahead, len(target)).
+		:rtype: tuple.
+		"""
+		if index < 0:
+			index += self.__len__()
+		if index < 0 or index >= self.__len__():
+			raise IndexError("dataset index out of range.")
+
+		# Set the window.
+		t = index + self.window.lookback
+		data = self.window.asbackend(self.root[t-self.window.lookback:t+1])
+		for norm in self.window.norm:
+			data = self.window.normalise(data, norm)
+		data = self.window.asoutput(data[-self.window.lookback:,:])
+
+		# Set the target.
+		num = self.root[t+1:t+self.lookahead+1, self.target]
+		den = self.root[t, self.target]
+		target = self.window.asoutput(self.window.asbackend(
+			100.0 * ( num / ( den + 1.0E-12 ) - 1 )))
+
+		return data, target
+
+	def __getstate__(self):
+		"""Special method for class object pickling, the root is shared
+		through its file rather than copied.
+		"""
+		state = self.__dict__.copy()
+		state["root"] = None
+		state["_tmpdir"] = None
+		state["_finalizer"] = None
+		return state
+
+	def __setstate__(self, state):
+		"""Special method for class object unpickling.
+		"""
+		self.__dict__.update(state)
+		self.root = numpy.load(self.path, mmap_mode="r")
+		return
+
+	def _check_target(self, target):
+		"""Check the target and returns its column indices.
+		"""
+		if target is None:
+			return list(range(self.window.collen))
+		if isinstance(target, str):
+			target = [target]
+		try:
+			return [self.window.columns.index(column) for column in target]
+		except ValueError:
+			raise ValueError("Please provide a consistent target.")
+
+	def indices(self, shuffle=False, seed=None):
+		"""Returns the sample indices.
+
+		:param shuffle: shuffle the indices (optional).
+		:type shuffle: bool.
+		:param seed: the seed of the shuffle (optional).
+		:type seed: int.
+
+		:return: the indices.
+		:rtype: numpy array.
+		"""
+		index = numpy.arange(self.__len__())
+		if shuffle:
+			numpy.random.default_rng(seed).shuffle(index)
+		return index
+
+	def loader(self, batch_size=32, shuffle=True, num_workers=0,
+		pin_memory=False, **kwargs):
+		"""Returns a torch DataLoader over the dataset.
+
+		:param batch_size: the mini-batch size (optional).
+		:type batch_size: int.
+		:param shuffle: reshuffle the samples at every epoch (optional).
+		:type shuffle: bool.
+		:param num_workers: the number of loading processes (optional).
+		:type num_workers: int.
+		:param pin_memory: return the batches in pinned memory (optional).
+		:type pin_memory: bool.
+
+		:return: the data loader.
+		:rtype: torch DataLoader.
+		"""
+		from torch.utils.data import DataLoader
+		return DataLoader(self, batch_size=batch_size, shuffle=shuffle,
+			num_workers=num_workers, pin_memory=pin_memory,
+			persistent_workers=num_workers > 0, **kwargs)
+
+	def close(self):
+		"""Remove the memory-mapped root if it was written to a temporary file.
+		"""
+		self.root = None
+		if self._finalizer is not None:
+			self._finalizer()
+			self._finalizer = None
+		self._tmpdir = None
+		return
+
+
+class ShardDataset():
+	"""Class that handles a map-style dataset of memory-mapped shards.
+
+	The shards are the '.npy' features and targets files written by 
+	Prometheus.export and listed in their 'manifest.json' file. They are 
+	opened as memory-mapped arrays, such that the size of the dataset is 
+	limited by the disk rather than by the memory.
+
+	:attr directory: the directory of the shards.
+	:type directory: str.
+	:attr manifest: the manifest of the shards.
+	:type manifest: dict.
+	:attr offsets: the index of the first sample of each shard.
+	:type offsets: numpy array.
+	"""
+
+	def __init__(self, directory):
+		"""Special method for class object construction.
+
+		:param directory: the directory of the shards.
+		:type directory: str.
+		"""
+		self.directory = directory
+		with open(os.path.join(self.directory, "manifest.json")) as f:
+			self.manifest = json.load(f)
+		lengths = [shard["length"] for shard in self.manifest["shards"]]
+		self.offsets = numpy.concatenate(([0], numpy.cumsum(lengths, dtype=int)))
+		self._shards = None
+		return
+
+	def __repr__(self):
+		"""Special method for class object representation.
+		"""
+		_repr = {
+			"directory": self.directory,
+			"shards": len(self.manifest["shards"]),
+			"dtype": self.manifest["dtype"],
+			"length": self.__len__()}
+		return _repr
+
+	def __str__(self):
+		"""Special method for class object printable version.
+		"""
+		_str = []
+		for key, item in self.__repr__().items():
+			_str.append("{} = {}".format(key, item))
+		return "{}({})".format(self.__class__.__name__, ", ".join(_str))
+
+	def __len__(self):
+		"""Special method for class object length.
+		"""
+		return int(self.offsets[-1])
+
+	def __getitem__(self, index):
+		"""Special method for class object item accessibility.
+
+		:param index: the index of the sample.
+		:type index: int.
+
+		:return: the features and the targets of the sample.
+		:rtype: tuple.
+		"""
+		if index < 0:
+			index += self.__len__()
+		if index < 0 or index >= self.__len__():
+			raise IndexError("dataset index out of range.")
+		i = int(numpy.searchsorted(self.offsets, index, side="right")) - 1
+		X, Y = self.shard(i)
+		j = index - self.offsets[i]
+		return numpy.asarray(X[j]), numpy.asarray(Y[j])
+
+	def __getstate__(self):
+		"""Special method for class object pickling, the shards are 
+		reopened rather than copied.
+		"""
+		state = self.__dict__.copy()
+		state["_shards"] = None
+		return state
+
+	def shard(self, i):
+		"""Returns the memory-mapped features and targets of a shard.
+
+		:param i: the index of the shard.
+		:type i: int.
+
+		:return: the features and the targets.
+		:rtype: tuple(numpy memmap, numpy memmap).
+		"""
+		if self._shards is None:
+			self._shards = {}
+		if i not in self._shards:
+			shard = self.manifest["shards"][i]
+			self._shards[i] = tuple(numpy.load(os.path.join(
+				self.directory, shard[name]), mmap_mode="r") for name in ("X", "Y"))
+		return self._shards[i]
+
+	def batches(self, batch_size=32, shuffle=True, seed=None, drop_last=False):
+		"""Returns a generator of the batches of samples.
+
+		The shards are visited in a random order and the samples are shuffled 
+		within each shard, such that every batch is read from at most two shards.
+
+		:param batch_size: the mini-batch size (optional).
+		:type batch_size: int.
+		:param shuffle: shuffle the shards and the samples (optional).
+		:type shuffle: bool.
+		:param seed: the seed of the shuffle (optional).
+		:type seed: int.
+		:param drop_last: drop the last incomplete batch (optional).
+		:type drop_last: bool.
+
+		:return: the features and the targets of each batch.
+		:rtype: generator of tuple(numpy array, numpy array).
+		"""
+		rng = numpy.random.default_rng(seed)
+		order = numpy.arange(len(self.manifest["shards"]))
+		if shuffle:
+			rng.shuffle(order)
+		rest = None
+		for i in order:
+			X, Y = self.shard(i)
+			index = numpy.arange(len(X))
+			if shuffle:
+				rng.shuffle(index)
+			for start in range(0, len(index), batch_size):
+				# gather in increasing order to read the memory map forward
+				take = numpy.sort(index[start:start+batch_size])
+				batch = (X[take], Y[take])
+				if rest is not None:
+					batch = tuple(numpy.concatenate(item) for item in zip(rest, batch))
+					rest = None
+				if len(batch[0]) < batch_size:
+					rest = batch
+					continue
+				yield batch[0][:batch_size], batch[1][:batch_size]
+				if len(batch[0]) > batch_size:
+					rest = (batch[0][batch_size:], batch[1][batch_size:])
+		if rest is not None and not drop_last:
+			yield rest
+		return
@@ -4,9 +4,13 @@
 import numpy
 import pandas
 
+from bisect import bisect_right
+from collections import deque
+
 from .record import Record
 from .trades import Trades
 from .wallet import Wallet
+from .orderbook import OrderBook, BookSide
 
 
 class Exchange():
@@ -32,9 +36,50 @@ class Exchange():
 	:type wallet_quote: class.
 	:attr fees: the exchange fees.
 	:type fees: float.	
+	:attr volume: the quote volume traded over the fees window.
+	:type volume: float.
+	:attr fees_window: the rolling window of the traded volume for the fees tiers,
+		a number in the units of numeric timestamps.
+	:type fees_window: numpy timedelta64 or number.
+	:attr book: the resting limit orders.
+	:type book: OrderBook.
+	:attr resync_hook: the function that returns a (prices, qtys) snapshot of 
+		a side of the orderbook when its checksum does not match.
+	:type resync_hook: callable.
+	:attr checksum_fn: the function that returns the checksum of the (side, 
+		prices, qtys) top levels of a side of the orderbook, as computed by the 
+		platform, BookSide.checksum by default.
+	:type checksum_fn: callable.
+	:attr _depth: the cumulative depth of each side of the current orderbook.
+	:type _depth: dict.
+	:attr _sides: the sides of the orderbook updated by level deltas.
+	:type _sides: dict(str, BookSide).
+	:attr _replaced: the sides of the replaced orders not matched since.
+	:type _replaced: set(str).
+	:attr _locks: the wallet and the qty reserved per base qty of each 
+		resting order.
+	:type _locks: dict(int, tuple(Wallet, float)).
+	:attr _consumed: the base qty of each level of each side of the orderbook
+		already filled by the resting orders, until the level changes.
+	:type _consumed: dict(str, dict(float, float)).
 	"""
 
-	def __init__(self, platform, symbol, base_qty=0.0, quote_qty=0.0):
+	# The fees tiers of each platform, as the increasing quote volume
+	# thresholds and the fees in percent below, between and above them.
+	FEES = {
+		"kraken": (
+			(0.050E+6, 0.100E+6, 0.250E+6, 0.500E+6, 1.000E+6, 2.500E+6, 5.000E+6, 10.0E+6),
+			(0.16, 0.14, 0.12, 0.10, 0.08, 0.06, 0.04, 0.02, 0.00)),
+		"bitfinex": (
+			(0.050E+6, 0.500E+6, 1.000E+6, 2.500E+6, 7.5E+6),
+			(0.1, 0.08, 0.06, 0.04, 0.02, 0.00)),
+		"binance": (
+			(),
+			(0.1,)),
+	}
+
+	def __init__(self, platform, symbol, base_qty=0.0, quote_qty=0.0,
+		fees_window=numpy.timedelta64(30, "D")):
 		"""Special method for class object construction.
 		"""
 
@@ -56,6 +101,16 @@ class Exchange():
 		self.bid_price = []
 		self.ask_qty = []
 		self.bid_qty = []
+		self._depth = {}
+		self._sides = {}
+		self._replaced = set()
+		self._consumed = {"ask": {}, "bid": {}}
+		self._locks = {}
+		self.resync_hook = None
+		self.checksum_fn = None
+
+		# Set the resting limit orders.
+		self.book = OrderBook()
 
 		# Set the trades record.
 		self.trades = Trades()
@@ -64,6 +119,9 @@ class Exchange():
 		self.wealth = Record()
 
 		# Update fees according to platform
+		self.volume = 0.0
+		self.fees_window = fees_window
+		self._volume = deque()
 		self.fees = self.update_fees()
 
 		return
@@ -75,6 +133,7 @@ class Exchange():
 		msg.append("# --- Exchange --- #")
 		msg.append("# symbol .... = {}".format(self.symbol))
 		msg.append("# fees ...... = {}".format(self.fees))
+		msg.append("# volume .... = {}".format(self.volume))
 		msg.append("# -------------- #")
 		return "\n".join(msg)
 
@@ -88,6 +147,15 @@ class Exchange():
 		"""
 		self.trades.clear()
 		self.wealth.clear()
+		self.book = OrderBook()
+		self._replaced.clear()
+		for wallet, unit in self._locks.values():
+			wallet.locked = 0.0
+		self._locks = {}
+		self._consumed = {"ask": {}, "bid": {}}
+		self.volume = 0.0
+		self._volume.clear()
+		self.fees = self.update_fees()
 		return
 
 	def update(self, t, ask_p, ask_q, bid_p, bid_q):
@@ -109,40 +177,232 @@ class Exchange():
 		self.ask_qty = ask_q		
 		self.bid_price = bid_p
 		self.bid_qty = bid_q
+		self._depth = {}
+		self._sides = {}
+		self._consumed = {"ask": {}, "bid": {}}
+		if self.evict_volume(t):
+			self.fees = self.update_fees()
+		if self.book:
+			self.match_orders()
+		return
+
+	def apply_deltas(self, t, side, prices, qtys, checksum=None):
+		"""Update the current timestamp and a side of the orderbook with level 
+		deltas, a null qty removing the level. The side is kept in place, 
+		starting from the last snapshot given to update. Only the resting 
+		orders of the opposite side, and the replaced ones, are matched.
+
+		:param t: the current timestamp.
+		:type t: numpy datetime64.
+		:param side: the side of the orderbook, 'ask' or 'bid'.
+		:type side: str.
+		:param prices: the level prices.
+		:type prices: list<float>.
+		:param qtys: the new level qties.
+		:type qtys: list<float>.
+		:param checksum: the checksum of the side after the deltas, 
+			see get_checksum (optional).
+		:type checksum: int.
+
+		.. note:: if the checksum does not match and the side can not be 
+			resynced, the deltas are rolled back before the error is raised.
+		"""
+		if side not in self._sides:
+			self._sides[side] = BookSide(side, *self.get_book(side))
+		book = self._sides[side]
+		undo = book.apply(prices, qtys)
+		if checksum is not None and checksum != self.get_checksum(side):
+			try:
+				self.resync(side)
+			except Exception:
+				book.rollback(undo)
+				raise
+
+		self.timestamp = t
+		if self.evict_volume(t):
+			self.fees = self.update_fees()
+		if side == "ask":
+			self.ask_price, self.ask_qty = book.prices, book.qtys
+		else:
+			self.bid_price, self.bid_qty = book.prices, book.qtys
+		self._depth.pop(side, None)
+		consumed = self._consumed[side]
+		if consumed:
+			for price in prices:
+				consumed.pop(price, None)
+		if self.book:
+			self.match_orders({"bid" if side == "ask" else "ask"} | self._replaced)
 		return
 
+	def get_checksum(self, side, depth=10):
+		"""Returns the checksum of the top levels of a side of the orderbook.
+
+		:param side: the side of the orderbook, 'ask' or 'bid'.
+		:type side: str.
+		:param depth: the number of levels (optional).
+		:type depth: int.
+
+		:return: the checksum.
+		:rtype: int.
+		"""
+		book = self._sides.get(side)
+		if book is None:
+			book = BookSide(side, *self.get_book(side))
+		if self.checksum_fn is not None:
+			return self.checksum_fn(side, book.prices[:depth], book.qtys[:depth])
+		return book.checksum(depth)
+
+	def resync(self, side):
+		"""Reset a side of the orderbook with the snapshot returned by the resync hook.
+
+		:param side: the side of the orderbook, 'ask' or 'bid'.
+		:type side: str.
+		"""
+		if self.resync_hook is None:
+			raise ValueError("The {} side of the orderbook is out of sync.".format(side))
+		prices, qtys = self.resync_hook(side)
+		self._sides.setdefault(side, BookSide(side)).reset(prices, qtys)
+		self._consumed[side].clear()
+		return
+
+	def get_top(self, side):
+		"""Returns the best price and qty of a side of the orderbook.
+
+		:param side: the side of the orderbook, 'ask' or 'bid'.
+		:type side: str.
+
+		:return: the best price and qty, or None if the side is empty.
+		:rtype: tuple.
+		"""
+		if side in self._sides:
+			return self._sides[side].best()
+		if side == "ask":
+			prices, qtys = self.ask_price, self.ask_qty
+		elif side == "bid":
+			prices, qtys = self.bid_price, self.bid_qty
+		else:
+			raise ValueError("Unsupported side {}".format(side))
+		if len(prices) == 0:
+			return None
+		return (float(prices[0]), float(qtys[0]))
+
+	def get_book(self, side):
+		"""Returns the levels of a side of the orderbook as arrays.
+
+		:param side: the side of the orderbook, 'ask' or 'bid'.
+		:type side: str.
+
+		:return prices: the level prices, from the best to the worst.
+		:rtype prices: numpy array.
+		:return qtys: the level base qties.
+		:rtype qtys: numpy array.
+		"""
+		if side == "ask":
+			prices, qtys = self.ask_price, self.ask_qty
+		elif side == "bid":
+			prices, qtys = self.bid_price, self.bid_qty
+		else:
+			raise ValueError("Unsupported side {}".format(side))
+		return (numpy.asarray(prices, dtype=numpy.float64), 
+			numpy.asarray(qtys, dtype=numpy.float64))
+
+	def get_depth(self, side):
+		"""Returns the cumulative depth of a side of the orderbook, computed once
+		per update of the orderbook.
+
+		:param side: the side of the orderbook, 'ask' or 'bid'.
+		:type side: str.
+
+		:return prices: the level prices, from the best to the worst.
+		:rtype prices: numpy array.
+		:return depth: the cumulative base qty up to each level.
+		:rtype depth: numpy array.
+		:return quote: the cumulative quote qty up to each level.
+		:rtype quote: numpy array.
+		"""
+		if side not in self._depth:
+			prices, qtys = self.get_book(side)
+			self._depth[side] = (prices, numpy.cumsum(qtys), numpy.cumsum(prices * qtys))
+		return self._depth[side]
+
+	def get_liquidity(self, side, base_qty):
+		"""Returns the liquidity curve of a side of the orderbook, such as 
+		the cost of buying or the gain of selling each of the base qties.
+
+		:param side: the side of the orderbook, 'ask' to buy or 'bid' to sell.
+		:type side: str.
+		:param base_qty: the base qties to check.
+		:type base_qty: numpy array.
+
+		:return quote: the cost ('ask') or gain ('bid') of each qty, fees included.
+		:rtype quote: numpy array.
+		:return fees: the fees of each qty.
+		:rtype fees: numpy array.
+		:return qty: the filled base qty of each qty.
+		:rtype qty: numpy array.
+		:return price: the marginal price of each qty, as the worst filled price.
+		:rtype price: numpy array.
+		"""
+		base_qty = numpy.asarray(base_qty, dtype=numpy.float64)
+		prices, depth, quote = self.get_depth(side)
+		if len(prices) == 0:
+			zeros = numpy.zeros_like(base_qty)
+			return zeros, zeros.copy(), zeros.copy(), numpy.full_like(base_qty, numpy.nan)
+
+		# Find the level that completes each fill.
+		k = numpy.searchsorted(depth, base_qty, side="left")
+		level = numpy.minimum(k, len(depth) - 1)
+		previous = numpy.concatenate(([0.0], depth))[level]
+		trade = numpy.concatenate(([0.0], quote))[level] + prices[level] * ( base_qty - previous )
+		trade = numpy.where(k < len(depth), trade, quote[-1])
+		qty = numpy.minimum(base_qty, depth[-1])
+
+		fees = trade * self.fees
+		if side == "ask":
+			return trade + fees, fees, qty, prices[level]
+		return trade - fees, fees, qty, prices[level]
+
+	def sweep(self, side, base_qty):
+		"""Sweep a side of the orderbook for a base qty, the last level
+		being partially filled.
+
+		:param side: the side of the orderbook, 'ask' or 'bid'.
+		:type side: str.
+		:param base_qty: the base qty to sweep.
+		:type base_qty: float.
+
+		:return trade: the quote qty of the fill, before fees.
+		:rtype trade: float.
+		:return qty: the filled base qty.
+		:rtype qty: float.
+		:return price: the worst filled price.
+		:rtype price: float.
+		"""
+		prices, depth, quote = self.get_depth(side)
+		if len(prices) == 0:
+			return 0.0, 0.0, numpy.nan
+
+		# Find the level that completes the fill.
+		k = int(numpy.searchsorted(depth, base_qty, side="left"))
+		if k == len(depth):
+			return float(quote[-1]), float(depth[-1]), float(prices[-1])
+		if k == 0:
+			return float(prices[0] * base_qty), float(base_qty), float(prices[0])
+		trade = quote[k-1] + prices[k] * ( base_qty - depth[k-1] )
+		return float(trade), float(base_qty), float(prices[k])
+
 	def check_bid_qty(self, base_qty):
 		"""Check the bid side of the orderbook for available qty
 		
 		:attr base_qty: the base qty to check.
 		:type base_qty: float.
-		"""
-		initial_qty = base_qty
-		final_qty = 0.0
-		trade = 0.0
-		fees = 0.0
-		gain = 0.0
-
-		for q, p in zip(self.bid_qty, self.bid_price):
-
-			if q > base_qty:
-				trade += p*base_qty
-				fees += (p*base_qty) * self.fees
-				gain = trade - fees
-				base_qty = 0.0
-				break
 
-			else:
-				trade += p*q
-				fees += (p*q) * self.fees
-				gain = trade - fees
-				base_qty -= q
-		
-		if base_qty == 0:
-			final_qty = initial_qty
-		else:
-			final_qty = initial_qty - base_qty	
-	
+		:return: the gain, the fees, the sold qty and the worst price.
+		:rtype: tuple.
+		"""
+		trade, final_qty, p = self.sweep("bid", base_qty)
+		fees = trade * self.fees
+		gain = trade - fees
 		return gain, fees, final_qty, p
 
 	def check_ask_qty(self, base_qty):
@@ -150,42 +410,17 @@ class Exchange():
 		
 		:attr base_qty: the base qty to check.
 		:type base_qty: float.
-		"""
-		initial_qty = base_qty
-		final_qty = 0.0
-		trade = 0.0
-		fees = 0.0
-		cost = 0.0
-
-		for q, p in zip(self.ask_qty, self.ask_price):
-
-			if q > base_qty:
-				trade += p * base_qty
-				fees += (p * base_qty) * self.fees
-				cost = trade + fees
-				base_qty = 0.0
-				if self.wallet_quote.qty - cost >= 0.0:
-					break
-				else:
-					trade = 0.0
-					fees = 0.0
-					cost = 0.0
-					base_qty = initial_qty
-					break
 
-			else:
-				trade += p*q
-				fees += (p*q) * self.fees
-				cost = trade + fees
-				base_qty -= q		
-				
-		if base_qty == 0:
-			final_qty = initial_qty
-		elif base_qty == initial_qty:
-			final_qty = 0
-		else:
-			final_qty = initial_qty - base_qty
+		:return: the cost, the fees, the bought qty and the worst price.
+		:rtype: tuple.
 
+		.. note:: a full fill that exceeds the quote wallet is rejected as a zero fill.
+		"""
+		trade, final_qty, p = self.sweep("ask", base_qty)
+		fees = trade * self.fees
+		cost = trade + fees
+		if final_qty == base_qty and self.wallet_quote.available - cost < 0.0:
+			return 0.0, 0.0, 0, p
 		return cost, fees, final_qty, p
 
 	def buy_market(self, base_qty):
@@ -197,14 +432,15 @@ class Exchange():
 
 		cost, fees, buy_qty, buy_price = self.check_ask_qty(base_qty)
 
-		if cost <= self.wallet_quote.qty and cost > 0:
+		if cost <= self.wallet_quote.available and cost > 0:
 			self.wallet_base.plus(buy_qty)
 			self.wallet_quote.minus(cost)
 			self.trades.append(self.timestamp, buy_price, 
 				(cost-fees), buy_qty, fees, "buy")
+			self.add_volume(self.timestamp, cost - fees)
 		if buy_qty < base_qty:
 			print("Buy market: Market liquidities are not sufficient to realise full trade.")
-		elif cost > self.wallet_quote.qty:
+		elif cost > self.wallet_quote.available:
 			print("Buy market: Your funds are not sufficient to realise this trade.")
 
 		return
@@ -219,11 +455,12 @@ class Exchange():
 
 		gain, fees, sell_qty, sell_price = self.check_bid_qty(base_qty)
 
-		if sell_qty <= self.wallet_base.qty and sell_qty > 0:
+		if sell_qty <= self.wallet_base.available and sell_qty > 0:
 			self.wallet_base.minus(sell_qty)
 			self.wallet_quote.plus(gain)
 			self.trades.append(self.timestamp, sell_price, 
 				(gain-fees), sell_qty, fees, "sell")
+			self.add_volume(self.timestamp, gain + fees)
 		if sell_qty < base_qty:
 			print("Sell market: Market liquidities are not sufficient to realise full trade.")
 		
@@ -243,11 +480,12 @@ class Exchange():
 		fees_qty = quote_qty * self.fees
 		cost = quote_qty + fees_qty
 
-		if cost <= self.wallet_quote.qty:
+		if cost <= self.wallet_quote.available:
 			self.wallet_base.plus(base_qty)
 			self.wallet_quote.minus(cost)
 			self.trades.append(self.timestamp, bid_price, 
 				quote_qty, base_qty, fees_qty, "buy")
+			self.add_volume(self.timestamp, quote_qty)
 		else:
 			print("Buy limit: Your funds are not sufficient to realise this trade")
 
@@ -267,16 +505,199 @@ class Exchange():
 		fees_qty = quote_qty * self.fees
 		gain = quote_qty - fees_qty
 
-		if base_qty <= self.wallet_base.qty:
+		if base_qty <= self.wallet_base.available:
 			self.wallet_base.minus(base_qty)
 			self.wallet_quote.plus(gain)
 			self.trades.append(self.timestamp, ask_price, 
 				quote_qty, base_qty, fees_qty, "sell")
+			self.add_volume(self.timestamp, quote_qty)
 		else:
 			print("Sell limit: Your funds are not sufficient to realise this trade")
 
 		return "sell", ask_price
 
+	def place_limit(self, otype, base_qty, price):
+		"""Place a limit order, the part of the order that crosses the
+		orderbook is filled at once and the rest is resting in the book 
+		until a later update crosses it. The funds of the resting qty are 
+		locked in the wallet until it is filled, replaced or cancelled.
+
+		:param otype: the order type, 'buy' or 'sell'.
+		:type otype: str.
+		:param base_qty: the base qty.
+		:type base_qty: float.
+		:param price: the limit price.
+		:type price: float.
+
+		:return: the id of the resting order, or None if nothing is resting.
+		:rtype: int.
+		"""
+		if otype == "buy":
+			side, opposite = "bid", "ask"
+			if base_qty * price * ( 1 + self.fees ) > self.wallet_quote.available:
+				print("Place limit: Your funds are not sufficient to place this order.")
+				return None
+		elif otype == "sell":
+			side, opposite = "ask", "bid"
+			if base_qty > self.wallet_base.available:
+				print("Place limit: Your funds are not sufficient to place this order.")
+				return None
+		else:
+			raise ValueError("Please provide a consistent ordertype.")
+
+		# Fill the part of the order that crosses the orderbook.
+		prices, depth, _ = self.get_depth(opposite)
+		if side == "bid":
+			n = int(numpy.searchsorted(prices, price, side="right"))
+		else:
+			n = int(numpy.searchsorted(-prices, -price, side="right"))
+		qty = min(base_qty, depth[n-1]) if n > 0 else 0.0
+		if qty > 0:
+			if otype == "buy":
+				self.buy_market(qty)
+			else:
+				self.sell_market(qty)
+
+		# Rest the remaining qty.
+		if base_qty - qty <= 0:
+			return None
+		order_id = self.book.add(side, base_qty - qty, price, self.timestamp)
+		self._lock(order_id, side, base_qty - qty, price)
+		return order_id
+
+	def _get_lock(self, side, price):
+		"""Returns the wallet and the qty locked per base qty of an order.
+		"""
+		if side == "bid":
+			return self.wallet_quote, price * ( 1 + self.fees )
+		return self.wallet_base, 1.0
+
+	def _lock(self, order_id, side, base_qty, price):
+		"""Lock the funds of a resting order.
+		"""
+		wallet, unit = self._get_lock(side, price)
+		wallet.lock(base_qty * unit)
+		self._locks[order_id] = (wallet, unit)
+		return
+
+	def _unlock(self, order_id, base_qty):
+		"""Release the funds of a base qty of a resting order.
+		"""
+		if order_id not in self._locks:
+			return
+		wallet, unit = self._locks[order_id]
+		wallet.unlock(base_qty * unit)
+		if order_id not in self.book:
+			del self._locks[order_id]
+		return
+
+	def cancel_order(self, order_id):
+		"""Cancel a resting limit order.
+
+		:param order_id: the order id.
+		:type order_id: int.
+
+		:return: True if the order was resting.
+		:rtype: bool.
+		"""
+		order = self.book.cancel(order_id)
+		if order is None:
+			return False
+		self._unlock(order_id, order.qty)
+		return True
+
+	def replace_order(self, order_id, base_qty=None, price=None):
+		"""Replace the qty and/or the price of a resting limit order, the order
+		is filled at the next update if its new price crosses the orderbook.
+
+		:param order_id: the order id.
+		:type order_id: int.
+		:param base_qty: the new base qty (optional).
+		:type base_qty: float.
+		:param price: the new limit price (optional).
+		:type price: float.
+
+		:return: True if the order was resting with sufficient funds.
+		:rtype: bool.
+		"""
+		order = self.book.orders.get(order_id)
+		if order is None:
+			return False
+		base_qty = order.qty if base_qty is None else base_qty
+		price = order.price if price is None else price
+		wallet, unit = self._get_lock(order.side, price)
+		old_wallet, old_unit = self._locks[order_id]
+		if base_qty * unit > wallet.available + order.qty * old_unit:
+			print("Replace order: Your funds are not sufficient to replace this order.")
+			return False
+		qty = order.qty
+		self.book.replace(order_id, base_qty, price, self.timestamp)
+		old_wallet.unlock(qty * old_unit)
+		self._lock(order_id, order.side, base_qty, price)
+		self._replaced.add(order.side)
+		return True
+
+	def match_orders(self, sides=("bid", "ask")):
+		"""Fill the resting limit orders crossed by the current orderbook, 
+		at their limit price. The opposite side is only read if it crosses 
+		the best resting order, and then from its cached cumulative depth, 
+		less the qty of its levels already filled since they last changed.
+
+		:param sides: the sides of the resting orders to match (optional).
+		:type sides: tuple(str) or set(str).
+
+		.. note:: an order whose fill exceeds the wallet is cancelled.
+		"""
+		for side, otype, opposite in (("bid", "buy", "ask"), ("ask", "sell", "bid")):
+			if side not in sides:
+				continue
+			self._replaced.discard(side)
+			top = self.get_top(opposite)
+			if top is None or not self.book.crosses(side, top[0]):
+				continue
+			prices, depth, _ = self.get_depth(opposite)
+			consumed = self._consumed[opposite]
+			if consumed:
+				qtys = numpy.diff(depth, prepend=0.0)
+				qtys -= [consumed.get(item, 0.0) for item in prices]
+				depth = numpy.cumsum(numpy.maximum(qtys, 0.0))
+			filled = 0.0
+			for order_id, price, qty, remaining in self.book.match(side, prices, depth):
+				self._unlock(order_id, qty)
+				quote_qty = qty * price
+				fees_qty = quote_qty * self.fees
+				if otype == "buy" and quote_qty + fees_qty <= self.wallet_quote.available:
+					self.wallet_base.plus(qty)
+					self.wallet_quote.minus(quote_qty + fees_qty)
+				elif otype == "sell" and qty <= self.wallet_base.available:
+					self.wallet_base.minus(qty)
+					self.wallet_quote.plus(quote_qty - fees_qty)
+				else:
+					print("Match orders: Your funds are not sufficient to fill order {}.".format(order_id))
+					self.cancel_order(order_id)
+					continue
+				self.trades.append(self.timestamp, price, 
+					qty, quote_qty, fees_qty, otype)
+				self.add_volume(self.timestamp, quote_qty)
+				filled += qty
+			self._consume(opposite, prices, depth, filled)
+		return
+
+	def _consume(self, side, prices, depth, base_qty):
+		"""Record the base qty filled from the best levels of a side.
+		"""
+		if base_qty <= 0:
+			return
+		n = min(int(numpy.searchsorted(depth, base_qty, side="left")), len(depth) - 1)
+		consumed = self._consumed[side]
+		previous = 0.0
+		for i in range(n + 1):
+			qty = min(depth[i], base_qty) - previous
+			if qty > 0:
+				consumed[prices[i]] = consumed.get(prices[i], 0.0) + qty
+			previous = depth[i]
+		return
+
 	def buy(self, ordertype, base_qty, premium=0.001):
 		"""Realise a buy order.
 
@@ -376,56 +797,72 @@ class Exchange():
 		wealth = self.wealth.aspandas()
 		return wealth.iloc[-1,-1]
 
+	def add_volume(self, t, quote_qty):
+		"""Add the quote qty of a trade to the volume traded over the fees window,
+		and update the fees.
+
+		:param t: the timestamp of the trade.
+		:type t: numpy datetime64, datetime, str or number.
+		:param quote_qty: the quote qty of the trade, before fees.
+		:type quote_qty: float.
+
+		.. note:: numeric timestamps require a numeric fees_window, in the 
+			same units.
+		"""
+		t = self._check_time(t)
+		self._volume.append((t, quote_qty))
+		self.volume += quote_qty
+		self.evict_volume(t)
+		self.fees = self.update_fees()
+		return
+
+	def _check_time(self, t):
+		"""Returns the timestamp as a numpy datetime64, or as a number if
+		the fees window is a number.
+		"""
+		if isinstance(t, numpy.datetime64):
+			return t
+		if isinstance(t, (int, float, numpy.number)) and not isinstance(t, bool):
+			if isinstance(self.fees_window, numpy.timedelta64):
+				raise ValueError("Please provide datetime timestamps, or a numeric fees_window in the units of the timestamps.")
+			return t
+		return numpy.datetime64(t)
+
+	def evict_volume(self, t):
+		"""Remove the trades older than the fees window from the traded volume.
+
+		:param t: the current timestamp.
+		:type t: numpy datetime64, datetime, str or number.
+
+		:return: True if trades were removed.
+		:rtype: bool.
+		"""
+		if t is None or not self._volume:
+			return False
+		start = self._check_time(t) - self.fees_window
+		if self._volume[0][0] > start:
+			return False
+		while self._volume and self._volume[0][0] <= start:
+			self.volume -= self._volume.popleft()[1]
+		if not self._volume:
+			self.volume = 0.0
+		return True
+
 	def update_fees(self):
-		"""Update the fees.
-		"""
-		total_trades = self.get_trades_sum()
-
-		if self.platform == "kraken":
-			if total_trades > 10.0E+6:
-				fees = 0.00
-			elif total_trades < 0.050E+6:
-				fees = 0.16
-			elif total_trades < 0.100E+6:
-				fees = 0.14
-			elif total_trades < 0.250E+6:
-				fees = 0.12
-			elif total_trades < 0.500E+6:
-				fees = 0.10
-			elif total_trades < 1.000E+6:
-				fees = 0.08
-			elif total_trades < 2.500E+6:
-				fees = 0.06
-			elif total_trades < 5.000E+6:
-				fees = 0.04
-			else:
-				fees = 0.02
-
-		elif self.platform == "bitfinex":
-			if total_trades > 7.5E+6:
-				fees = 0.00
-			elif total_trades < 0.050E+6:
-				fees = 0.1
-			elif total_trades < 0.500E+6:
-				fees = 0.08
-			elif total_trades < 1.000E+6:
-				fees = 0.06
-			elif total_trades < 2.500E+6:
-				fees = 0.04
-			else:
-				fees = 0.02
+		"""Update the fees from the volume traded over the fees window.
 
-		elif self.platform == "binance":
-			fees = 0.1
-		else:
-			raise Exception
-			
-		return fees / 100
+		:return: the fees.
+		:rtype: float.
+		"""
+		if self.platform not in self.FEES:
+			raise ValueError("Unsupported platform {}".format(self.platform))
+		thresholds, fees = self.FEES[self.platform]
+		return fees[bisect_right(thresholds, self.volume)] / 100
 
 	def update_wealth(self):
 		"""Update the wealth.
 		"""
-		if isinstance(self.bid_price, list):
+		if isinstance(self.bid_price, (list, numpy.ndarray)):
 			try:
 				wealth = self.wallet_quote.qty + self.wallet_base.qty * self.bid_price[0]
 			except Exception as msg:
@@ -455,13 +892,14 @@ class Exchange():
 		# Compute the final quote quantity.
 		quote_qty = quote_qty + fees
 
-		if self.wallet_quote.qty < quote_qty:
+		if self.wallet_quote.available < quote_qty:
 			pass #print("Buy dummy market: not enough quote funds.")
 		else:
 			self.wallet_quote.minus(quote_qty)
 			self.wallet_base.plus(base_qty)
 			self.trades.append(self.timestamp, 
 				price, base_qty, quote_qty, fees, "buy")
+			self.add_volume(self.timestamp, quote_qty - fees)
 
 		return
 
@@ -471,7 +909,7 @@ class Exchange():
 		:param base_qty: the base quantity to sell.
 		:type base_qty: float.
 		"""
-		if self.wallet_base.qty < base_qty:
+		if self.wallet_base.available < base_qty:
 			#print("Buy dummy market: not enough base funds.")
 			return
 
@@ -487,12 +925,13 @@ class Exchange():
 		# Compute the final quote quantity.
 		quote_qty = quote_qty - fees
 
-		if self.wallet_base.qty < base_qty:
+		if self.wallet_base.available < base_qty:
 			pass#print("Sell dummy market: not enough base funds.")
 		else:
 			self.wallet_quote.plus(quote_qty)
 			self.wallet_base.minus(base_qty)
 			self.trades.append(self.timestamp, 
 				price, base_qty, quote_qty, fees, "sell")
+			self.add_volume(self.timestamp, quote_qty + fees)
 
 		return
@@ -0,0 +1,456 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import zlib
+import numpy
+
+from bisect			import bisect_left, insort
+from itertools		import count
+from collections	import deque
+
+
+class Order():
+	"""Class that handles a resting limit order.
+
+	:attr id: the order id.
+	:type id: int.
+	:attr side: the side of the order, 'bid' or 'ask'.
+	:type side: str.
+	:attr price: the limit price.
+	:type price: float.
+	:attr qty: the remaining base qty.
+	:type qty: float.
+	:attr t: the timestamp of the order.
+	:type t: numpy datetime64.
+	"""
+
+	__slots__ = ("id", "side", "price", "qty", "t")
+
+	def __init__(self, id, side, price, qty, t=None):
+		"""Special method for class object construction.
+		"""
+		self.id = id
+		self.side = side
+		self.price = price
+		self.qty = qty
+		self.t = t
+		return
+
+	def __repr__(self):
+		"""Special method for class object representation.
+		"""
+		return "{}(id = {}, side = {}, price = {}, qty = {}, t = {})".format(
+			self.__class__.__name__, self.id, self.side, self.price, self.qty, self.t)
+
+
+class OrderBook():
+	"""Class that handles the resting limit orders of an exchange.
+
+	Each side keeps its price levels in a sorted list, the best level being
+	the last one, and a FIFO queue of orders per level. The orders are filled
+	by price then time priority against the opposite side of the market.
+
+	:attr orders: the resting orders by id.
+	:type orders: dict(int, Order).
+	:attr keys: the sorted level keys of each side, the price for the bids
+		and the negative price for the asks.
+	:type keys: dict(str, list<float>).
+	:attr levels: the FIFO queue of orders of each level of each side.
+	:type levels: dict(str, dict(float, deque(Order))).
+	"""
+
+	SIDES = ("bid", "ask")
+
+	def __init__(self):
+		"""Special method for class object construction.
+		"""
+		self.orders = {}
+		self.keys = {side: [] for side in self.SIDES}
+		self.levels = {side: {} for side in self.SIDES}
+		self._ids = count(1)
+		return
+
+	def __repr__(self):
+		"""Special method for class object representation.
+		"""
+		_repr = {
+			"orders": len(self.orders),
+			"bid": self.best("bid"),
+			"ask": self.best("ask")}
+		return _repr
+
+	def __str__(self):
+		"""Special method for class object printable version.
+		"""
+		_str = []
+		for key, item in self.__repr__().items():
+			_str.append("{} = {}".format(key, item))
+		return "{}({})".format(self.__class__.__name__, ", ".join(_str))
+
+	def __len__(self):
+		"""Special method for class object length.
+		"""
+		return len(self.orders)
+
+	def __contains__(self, order_id):
+		"""Special method for class object membership test.
+		"""
+		return order_id in self.orders
+
+	def _key(self, side, price):
+		"""Returns the sort key of a price level, such that the best level is the last.
+		"""
+		if side == "bid":
+			return price
+		elif side == "ask":
+			return -price
+		raise ValueError("Unsupported side {}".format(side))
+
+	def _insert(self, order):
+		key = self._key(order.side, order.price)
+		levels = self.levels[order.side]
+		if key not in levels:
+			insort(self.keys[order.side], key)
+			levels[key] = deque()
+		levels[key].append(order)
+		self.orders[order.id] = order
+		return
+
+	def _remove(self, order):
+		key = self._key(order.side, order.price)
+		queue = self.levels[order.side][key]
+		queue.remove(order)
+		if not queue:
+			self._remove_level(order.side, key)
+		del self.orders[order.id]
+		return
+
+	def _remove_level(self, side, key):
+		keys = self.keys[side]
+		del keys[bisect_left(keys, key)]
+		del self.levels[side][key]
+		return
+
+	def best(self, side):
+		"""Returns the best price of a side, or None if the side is empty.
+
+		:param side: the side, 'bid' or 'ask'.
+		:type side: str.
+		"""
+		keys = self.keys[side]
+		if not keys:
+			return None
+		return self.levels[side][keys[-1]][0].price
+
+	def add(self, side, qty, price, t=None):
+		"""Add a resting limit order at the end of the queue of its level.
+
+		:param side: the side of the order, 'bid' or 'ask'.
+		:type side: str.
+		:param qty: the base qty.
+		:type qty: float.
+		:param price: the limit price.
+		:type price: float.
+		:param t: the timestamp of the order (optional).
+		:type t: numpy datetime64.
+
+		:return: the order id.
+		:rtype: int.
+		"""
+		if qty <= 0:
+			raise ValueError("Please provide a positive qty.")
+		order = Order(next(self._ids), side, price, qty, t)
+		self._insert(order)
+		return order.id
+
+	def cancel(self, order_id):
+		"""Cancel a resting order.
+
+		:param order_id: the order id.
+		:type order_id: int.
+
+		:return: the cancelled order, or None if it is not resting.
+		:rtype: Order.
+		"""
+		order = self.orders.get(order_id)
+		if order is not None:
+			self._remove(order)
+		return order
+
+	def replace(self, order_id, qty=None, price=None, t=None):
+		"""Replace the qty and/or the price of a resting order. The order keeps
+		its queue priority only if its qty is reduced at the same price.
+
+		:param order_id: the order id.
+		:type order_id: int.
+		:param qty: the new base qty (optional).
+		:type qty: float.
+		:param price: the new limit price (optional).
+		:type price: float.
+		:param t: the timestamp of the replacement (optional).
+		:type t: numpy datetime64.
+
+		:return: the replaced order, or None if it is not resting.
+		:rtype: Order.
+		"""
+		order = self.orders.get(order_id)
+		if order is None:
+			return None
+		qty = order.qty if qty is None else qty
+		price = order.price if price is None else price
+		if qty <= 0:
+			raise ValueError("Please provide a positive qty.")
+		if price == order.price and qty <= order.qty:
+			order.qty = qty
+			return order
+		self._remove(order)
+		order.qty, order.price = qty, price
+		if t is not None:
+			order.t = t
+		self._insert(order)
+		return order
+
+	def crosses(self, side, price):
+		"""Returns True if the best resting order of a side crosses a price of 
+		the opposite side of the market.
+
+		:param side: the side of the resting orders, 'bid' or 'ask'.
+		:type side: str.
+		:param price: the best opposite price.
+		:type price: float.
+		"""
+		keys = self.keys[side]
+		return len(keys) > 0 and keys[-1] >= self._key(side, price)
+
+	def match(self, side, prices, depth):
+		"""Fill the resting orders of a side against the opposite side of
+		the market, by price then time priority.
+
+		:param side: the side of the resting orders, 'bid' or 'ask'.
+		:type side: str.
+		:param prices: the opposite level prices, from the best to the worst.
+		:type prices: numpy array.
+		:param depth: the cumulative opposite base qty up to each level.
+		:type depth: numpy array.
+
+		:return: the fills as (order id, limit price, filled qty, remaining qty).
+		:rtype: list<tuple>.
+		"""
+		fills = []
+		keys = self.keys[side]
+		if not keys or len(prices) == 0:
+			return fills
+
+		# The opposite levels that cross each limit price.
+		prices = numpy.asarray(prices, dtype=numpy.float64)
+		if side == "bid":
+			crossing = prices
+		else:
+			crossing = -prices
+
+		consumed = 0.0
+		while keys:
+			key = keys[-1]
+			n = int(numpy.searchsorted(crossing, key, side="right"))
+			if n == 0:
+				break
+			available = depth[n-1] - consumed
+			queue = self.levels[side][key]
+			while queue and available > 0:
+				order = queue[0]
+				qty = min(order.qty, available)
+				order.qty -= qty
+				available -= qty
+				consumed += qty
+				fills.append((order.id, order.price, qty, order.qty))
+				if order.qty <= 0:
+					queue.popleft()
+					del self.orders[order.id]
+			if queue:
+				break
+			keys.pop()
+			del self.levels[side][key]
+		return fills
+
+
+class BookSide():
+	"""Class that handles one side of a market orderbook updated by level deltas.
+
+	The levels are kept in sorted arrays, from the best to the worst price,
+	with spare capacity such that a level is found by bisection and inserted
+	or removed by shifting the arrays in place. The top of the book is the
+	first level.
+
+	:attr side: the side of the book, 'bid' or 'ask'.
+	:type side: str.
+	:attr size: the number of levels.
+	:type size: int.
+	:attr prices: the level prices, from the best to the worst.
+	:type prices: numpy array.
+	:attr qtys: the level base qties.
+	:type qtys: numpy array.
+	"""
+
+	def __init__(self, side, prices=(), qtys=(), capacity=64):
+		"""Special method for class object construction.
+
+		:param side: the side of the book, 'bid' or 'ask'.
+		:type side: str.
+		:param prices: the snapshot level prices (optional).
+		:type prices: list<float>.
+		:param qtys: the snapshot level base qties (optional).
+		:type qtys: list<float>.
+		:param capacity: the initial number of levels allocated (optional).
+		:type capacity: int.
+		"""
+		if side not in OrderBook.SIDES:
+			raise ValueError("Unsupported side {}".format(side))
+		self.side = side
+		self.size = 0
+		self._keys = numpy.empty(capacity)
+		self._prices = numpy.empty(capacity)
+		self._qtys = numpy.empty(capacity)
+		self.reset(prices, qtys)
+		return
+
+	def __repr__(self):
+		"""Special method for class object representation.
+		"""
+		_repr = {
+			"side": self.side,
+			"size": self.size,
+			"best": self.best()}
+		return _repr
+
+	def __str__(self):
+		"""Special method for class object printable version.
+		"""
+		_str = []
+		for key, item in self.__repr__().items():
+			_str.append("{} = {}".format(key, item))
+		return "{}({})".format(self.__class__.__name__, ", ".join(_str))
+
+	def __len__(self):
+		"""Special method for class object length.
+		"""
+		return self.size
+
+	@property
+	def prices(self):
+		return self._prices[:self.size]
+
+	@property
+	def qtys(self):
+		return self._qtys[:self.size]
+
+	def _key(self, price):
+		"""Returns the sort key of a price, increasing from the best to the worst price.
+		"""
+		return price if self.side == "ask" else -price
+
+	def _grow(self, size):
+		capacity = max(size, 2 * len(self._keys))
+		for name in ("_keys", "_prices", "_qtys"):
+			array = numpy.empty(capacity)
+			array[:self.size] = getattr(self, name)[:self.size]
+			setattr(self, name, array)
+		return
+
+	def reset(self, prices, qtys):
+		"""Replace the levels with a snapshot.
+
+		:param prices: the level prices.
+		:type prices: list<float>.
+		:param qtys: the level base qties.
+		:type qtys: list<float>.
+		"""
+		prices = numpy.asarray(prices, dtype=numpy.float64)
+		qtys = numpy.asarray(qtys, dtype=numpy.float64)
+		keep = qtys > 0
+		prices, qtys = prices[keep], qtys[keep]
+		keys = self._key(prices)
+		order = numpy.argsort(keys, kind="stable")
+		if len(order) > len(self._keys):
+			self.size = 0
+			self._grow(len(order))
+		self.size = len(order)
+		self._keys[:self.size] = keys[order]
+		self._prices[:self.size] = prices[order]
+		self._qtys[:self.size] = qtys[order]
+		return
+
+	def set(self, price, qty):
+		"""Set the qty of a price level, a null qty removing the level.
+
+		:param price: the level price.
+		:type price: float.
+		:param qty: the level base qty.
+		:type qty: float.
+
+		:return: the previous qty of the level, 0 if it was not set.
+		:rtype: float.
+		"""
+		key = self._key(price)
+		i = int(numpy.searchsorted(self._keys[:self.size], key))
+		found = i < self.size and self._keys[i] == key
+		previous = float(self._qtys[i]) if found else 0.0
+		if qty <= 0:
+			if found:
+				for array in (self._keys, self._prices, self._qtys):
+					array[i:self.size-1] = array[i+1:self.size]
+				self.size -= 1
+		elif found:
+			self._qtys[i] = qty
+		else:
+			if self.size == len(self._keys):
+				self._grow(self.size + 1)
+			for array, value in ((self._keys, key), (self._prices, price), (self._qtys, qty)):
+				array[i+1:self.size+1] = array[i:self.size]
+				array[i] = value
+			self.size += 1
+		return previous
+
+	def apply(self, prices, qtys):
+		"""Apply level deltas, a null qty removing the level.
+
+		:param prices: the level prices.
+		:type prices: list<float>.
+		:param qtys: the level base qties.
+		:type qtys: list<float>.
+
+		:return: the deltas that undo the applied ones, see rollback.
+		:rtype: list<tuple(float, float)>.
+		"""
+		undo = []
+		for price, qty in zip(prices, qtys):
+			undo.append((price, self.set(price, qty)))
+		return undo
+
+	def rollback(self, undo):
+		"""Undo applied level deltas.
+
+		:param undo: the deltas returned by apply.
+		:type undo: list<tuple(float, float)>.
+		"""
+		for price, qty in reversed(undo):
+			self.set(price, qty)
+		return
+
+	def best(self):
+		"""Returns the best price and qty, or None if the side is empty.
+		"""
+		if self.size == 0:
+			return None
+		return (self._prices[0], self._qtys[0])
+
+	def checksum(self, depth=10):
+		"""Returns the CRC32 of the float64 prices and qties of the top levels.
+
+		:param depth: the number of levels (optional).
+		:type depth: int.
+
+		:return: the checksum.
+		:rtype: int.
+		"""
+		n = min(depth, self.size)
+		return zlib.crc32(self._prices[:n].tobytes() + self._qtys[:n].tobytes())
@@ -1,10 +1,15 @@
 #!/usr/bin/env python
 # coding=utf-8
 
+import os
+import json
 import time
 import numpy
 import pandas
 import datetime
+from collections import deque
+
+from .batch import Batch
 
 # -------------------------------------------- #
 
@@ -28,12 +33,18 @@ class Prometheus:
 	:type ewma_span: int.
 	:attr ewma_freq: optional attribute for exponential moving average data sampling.
 	:type ewma_frea: str.
-	:attr categories: optional attribute such as to build drop and rise categories for classification purpose.
-	:type categories: tuple(tuple(lower_bound, upper_bound), ...).
+	:attr categories: optional attribute such as to build drop and rise categories for classification purpose,
+		given as the (lower_bound, upper_bound) of each category or as bin edges of the normalised targets.
+	:type categories: tuple(tuple(lower_bound, upper_bound), ...) or list<float>.
 	:attr features: name of the features that are represented in the root.
 	:type features: list<str>.
+	:attr scaler: optional attribute for the standardisation of the features and the targets,
+		given as the fitted count, mean and sum of squared deviations of each column.
+	:type scaler: dict.
 	:attr _norm: normalisation methods.
 	:type _norm: dict.
+	:attr _index: the positional indices of the column groups of the root.
+	:type _index: dict.
 	"""
 
 	def __init__(self):
@@ -46,6 +57,10 @@ class Prometheus:
 		self.targets = None
 		self.features = None
 		self.norm = None
+		self.categories = None
+		self.scaler = None
+		self._index = None
+		self._timeseries_index = None
 		return
 
 	def __repr__(self):
@@ -59,6 +74,9 @@ class Prometheus:
 		_repr.append("# targets ....... = {}".format(self.targets))		
 		_repr.append("# features ...... = {}".format(self.features))	
 		_repr.append("# norm .......... = {}".format(self.norm))
+		_repr.append("# categories .... = {}".format(self.categories))
+		_repr.append("# scaler ........ = {}".format(
+			None if self.scaler is None else list(self.scaler)))
 		_repr.append("# ------------------- #")
 		_repr.append("")
 		return "\n".join(_repr)
@@ -79,6 +97,9 @@ class Prometheus:
 		self.targets = attr["targets"]			
 		self.features = attr["features"]
 		self.norm = attr["norm"]
+		self.categories = attr.get("categories")
+		self.scaler = attr.get("scaler")
+		self._set_index()
 		return
 
 	def get_attr(self):
@@ -93,6 +114,8 @@ class Prometheus:
 		attr["targets"] = self.targets
 		attr["features"] = self.features
 		attr["norm"] = self.norm
+		attr["categories"] = self.categories
+		attr["scaler"] = self.scaler
 		return attr
 
 	# ----------------------------------- #
@@ -121,6 +144,7 @@ class Prometheus:
 			df = df.set_index("time")
 		df.index = pandas.to_datetime(df.index)		
 		self.root = df
+		self._set_index()
 		return
 
 	def set_past(self, past):
@@ -163,6 +187,7 @@ class Prometheus:
 		if self.targets is None:
 			raise ValueError("Please provide a consistent targets.")
 
+		self._set_index()
 		return 
 
 	def set_features(self, features=None):
@@ -172,6 +197,7 @@ class Prometheus:
 		:type features: tuple(str) or lst<str>.
 		"""
 		self.features = tuple(self.root.columns)
+		self._set_index()
 		return
 
 	def set_norm(self, method, ref=None, marker="#t"):
@@ -183,6 +209,67 @@ class Prometheus:
 		:type ref: str.
 		"""
 		self.norm = {"method":method, "ref":ref, "marker":marker}
+		self._set_index()
+		return
+
+	def _set_index(self):
+		"""Set the positional indices of the column groups of the root, such that 
+		the timeseries are built by positional slicing rather than by labels.
+
+		The indices are the positions of the features and of the targets in the root,
+		the positions of the normalised columns and of their references within the 
+		features and the targets, and the positions of the pivot references in the root.
+		"""
+		if self.root is None:
+			self._index = None
+			return
+		columns = list(self.root.columns)
+		marker = self.norm["marker"] if self.norm is not None else None
+		index = {}
+		for name, group, ref in (
+			("features", self.features, self.norm["ref"] if self.norm else None),
+			("targets", self.targets, self.targets[0] if self.targets else None)):
+			if group is None:
+				continue
+			positions = self.root.columns.get_indexer(list(group))
+			if (positions < 0).any():
+				raise ValueError("Please provide {} in the root: {}".format(name, 
+					[item for item, i in zip(group, positions) if i < 0]))
+			index[name] = self._as_index(positions)
+			if marker is None:
+				continue
+			norm = self._get_normalise_index(group, marker)
+			refs = self._get_normalise_index(group, marker, ref)
+			if norm and not refs:
+				raise ValueError("Please provide a consistent normalisation reference.")
+			index[name + "_norm"] = self._as_index(norm)
+			index[name + "_ref"] = self._as_index(refs)
+			index[name + "_pvt"] = self._as_index(
+				self._get_normalise_index(columns, marker, ref))
+		self._index = index
+		return
+
+	def _as_index(self, index):
+		"""Returns the positional index as a slice when it is contiguous,
+		and as an array otherwise.
+		"""
+		index = numpy.asarray(index, dtype=int)
+		if len(index) > 0 and numpy.array_equal(index, numpy.arange(index[0], index[0] + len(index))):
+			return slice(int(index[0]), int(index[0]) + len(index))
+		return index
+
+	def set_categories(self, categories=None):
+		"""Set the rise and drop categories of the targets.
+
+		:param categories: the (lower_bound, upper_bound) of each category, 
+			or the bin edges of the normalised targets (optional).
+		:type categories: tuple(tuple(float, float), ...) or list<float>.
+		"""
+		edges = Batch.get_edges(categories)
+		if edges is None:
+			self.categories = None
+		else:
+			self.categories = edges.tolist()
 		return
 
 	# ---------------------------------------------- #
@@ -252,12 +339,116 @@ class Prometheus:
 			/ df.loc[:,ref_norm_columns].shift(1).values )
 		return df
 
-	def set_timeseries(self):
+	@staticmethod
+	def _get_normalise_index(labels, marker, column=None):
+		index = []
+		for i, item in enumerate(labels):
+			if marker in item:
+				if column is None or column in item:
+					index.append(i)
+		return index
+
+	def _shift_into(self, block, values, step):
+		block[:] = numpy.nan
+		if step >= 0:
+			block[step:] = values[:len(values)-step]
+		else:
+			block[:step] = values[-step:]
+		return block
+
+	def _normalise_block(self, block, values, step, index, ref_index, pivot):
+		if self.norm["method"] == "pct_change":
+			ref = values[:,ref_index]
+			den = self._shift_into(numpy.empty((len(values), ref.shape[1])), ref, step + 1)
+			block[:,index] = 100 * ( block[:,index] / den - 1.0 )
+		elif self.norm["method"] == "pvt_change":
+			block[:,index] = 100 * ( block[:,index] / pivot - 1.0 )
+		elif self.norm["method"] == "log_change":
+			ref = values[:,ref_index]
+			den = self._shift_into(numpy.empty((len(values), ref.shape[1])), ref, step + 1)
+			block[:,index] = 100 * numpy.log( block[:,index] / den )
+		else:
+			raise ValueError("Please provide a consistent normalisation method.")
+		return block
+
+	def set_timeseries(self, engine="array"):
 		"""Set the timeseries dataframe for the specified targets and features.
+
+		:param engine: the build engine, 'array' or 'pandas' (optional).
+		:type engine: str.
+		"""
+		if engine == "array":
+			self._set_timeseries_array()
+		elif engine == "pandas":
+			self._set_timeseries_pandas()
+		else:
+			raise ValueError("Unsupported engine {}".format(engine))
+		return
+
+	def _set_timeseries_array(self):
+		"""Set the timeseries dataframe from one preallocated block 
+		filled with all the shifted and normalised steps.
+		"""
+
+		if self._index is None:
+			self._set_index()
+		root = self.root.to_numpy(dtype=numpy.float64)
+		normalise = self.norm is not None and self.norm["method"] is not None
+
+		# set the steps of the features and targets
+		steps = []
+		for marker, name, columns, horizon in (
+			("@X", "features", self.features, self.past),
+			("@Y", "targets", self.targets, self.future)):
+			if columns is None:
+				continue
+			values = root[:,self._index[name]]
+			index, ref_index, pivot = None, None, None
+			if normalise:
+				index = self._index[name + "_norm"]
+				ref_index = self._index[name + "_ref"]
+				pivot = root[:,self._index[name + "_pvt"]]
+			for step in horizon:
+				steps.append((marker, columns, values, step, index, ref_index, pivot))
+
+		# allocate the timeseries block, column-major as pandas stores it
+		width = sum(len(item[1]) for item in steps)
+		block = numpy.empty((len(self.root), width), order="F")
+
+		# fill the block with the shifted and normalised steps
+		labels = []
+		groups = {}
+		j = 0
+		for marker, columns, values, step, index, ref_index, pivot in steps:
+			sub = self._shift_into(block[:,j:j+len(columns)], values, step)
+			if normalise:
+				self._normalise_block(sub, values, step, index, ref_index, pivot)
+			labels.extend("{}_{}_{}".format(marker, column, step) for column in columns)
+			start = groups.get(marker, slice(j, j)).start
+			groups[marker] = slice(start, j + len(columns))
+			j += len(columns)
+
+		# clean the timeseries, moving the valid rows up in place column by column
+		valid = ~numpy.isnan(block).any(axis=1)
+		size = int(valid.sum())
+		if size < len(block):
+			for j in range(width):
+				column = block[:,j]
+				column[:size] = column[valid]
+			block = block[:size]
+		self.timeseries = pandas.DataFrame(block, index=self.root.index[valid], 
+			columns=labels, copy=False)
+		self._timeseries_index = groups
+
+		return
+
+	def _set_timeseries_pandas(self):
+		"""Set the timeseries dataframe by concatenating shifted dataframes.
 		"""
 
 		# init the timeseries
 		self.timeseries = pandas.DataFrame()
+		self._timeseries_index = None
 
 		# set the features of the timeseries
 		if self.features is not None:
@@ -331,26 +522,50 @@ class Prometheus:
 		targets = self._get_timeseries_label_targets()
 		return self.timeseries.loc[:,targets]
 
-	def _get_timeseries_features_as_array(self):
-		features = self._get_timeseries_features_as_dataframe()
-		features = features.values
+	def _get_timeseries_index(self, marker):
+		if self._timeseries_index is not None and marker in self._timeseries_index:
+			return self._timeseries_index[marker]
+		labels = self._get_normalise_index(self.timeseries.columns, marker)
+		return self._as_index(labels)
+
+	def _get_timeseries_as_array(self, index, dtype=None):
+		"""Returns the columns of the timeseries at index, copied straight 
+		into an array of dtype such that no intermediate copy is made.
+		"""
+		values = self.timeseries.to_numpy(copy=False)
+		if dtype is None:
+			dtype = values.dtype
+		if isinstance(index, slice):
+			array = numpy.empty((len(values), index.stop - index.start), dtype=dtype)
+			array[:] = values[:,index]
+			return array
+		array = numpy.empty((len(values), len(index)), dtype=dtype)
+		for i, j in enumerate(index):
+			array[:,i] = values[:,j]
+		return array
+
+	def _get_timeseries_features_as_array(self, dtype=None):
+		features = self._get_timeseries_as_array(
+			self._get_timeseries_index("@X"), dtype)
 		(m, n) = numpy.shape(features)
 		features = features.reshape(m, len(self.past), int(n/len(self.past)))
 		return features
 
-	def _get_timeseries_targets_as_array(self):
-		targets = self._get_timeseries_targets_as_dataframe()
-		targets = targets.values
+	def _get_timeseries_targets_as_array(self, dtype=None):
+		targets = self._get_timeseries_as_array(
+			self._get_timeseries_index("@Y"), dtype)
 		(m, n) = numpy.shape(targets)
 		if len(self.future) > 1:
 			targets = targets.reshape(m, len(self.future), int(n/len(self.future)))
 		return targets
 
-	def get_dataset(self):
+	def get_dataset(self, cache=None, dtype=None):
 		"""Return the dataset for the current root.
 
-		:param balanced: balance the dataset accross the categories.
-		:type balanced: bool.
+		:param cache: the cache of built datasets (optional).
+		:type cache: Cache.
+		:param dtype: the dtype of the dataset, such as numpy.float32 (optional).
+		:type dtype: numpy dtype.
 
 		:return X_train: the features.
 		:rtype X_train: numpy array of shape (m, t_x, n_x).
@@ -358,15 +573,384 @@ class Prometheus:
 		:rtype Y: numpy array of shape (m, n_y).
 		:return t: the timeseries index.
 		:rtype t: numpy array of shape (m, 1).
+
+		.. note:: with a cache, the timeseries is only set on a cache miss.
 		"""
+
+		# check the cache
+		if cache is not None:
+			key = cache.key(self.root, dtype=str(dtype), **self.get_attr())
+			data = cache.get(key)
+			if data is not None:
+				self.timeseries = None
+				self._timeseries_index = None
+				return data
+			if self.timeseries is None:
+				self.set_timeseries()
 		
 		# get the features
-		X = self._get_timeseries_features_as_array()
+		X = self._get_timeseries_features_as_array(dtype)
 		
 		# get the targets
-		Y = self._get_timeseries_targets_as_array()
+		Y = self._get_timeseries_targets_as_array(dtype)
+		if self.categories is not None:
+			Y = numpy.digitize(Y, self.categories)
+
+		# standardise the features and the targets
+		if self.scaler is not None:
+			X = self.standardise(X, "features")
+			Y = self.standardise(Y, "targets")
 
 		# remove timeseries
 		self.timeseries = None
+		self._timeseries_index = None
+
+		# store the dataset
+		if cache is not None:
+			cache.set(key, X, Y)
 
 		return (X, Y)
+
+	def _get_chunks(self, chunksize, dtype=None):
+		"""Returns a generator of the datasets of chunks of root rows, each chunk 
+		being extended by the past and future horizons of its first and last rows.
+		"""
+		back = max(self.past) + 1 if self.past else 0
+		ahead = -min(self.future) if self.future else 0
+		root = self.root
+		try:
+			for start in range(0, len(root), chunksize):
+				end = min(start + chunksize, len(root))
+				self.root = root.iloc[max(start - back, 0):min(end + ahead, len(root))]
+				self.set_timeseries()
+				self.timeseries = self.timeseries.loc[root.index[start]:root.index[end-1]]
+				yield self.get_dataset(dtype=dtype)
+		finally:
+			self.root = root
+			self.timeseries = None
+			self._timeseries_index = None
+		return
+
+	def export(self, directory, chunksize=100000, shardsize=65536, dtype=None):
+		"""Export the dataset of the current root to memory-mapped shards.
+
+		The root is processed in chunks of rows that overlap by the past and 
+		future horizons, such that only one chunk of the timeseries is held in 
+		memory. The features and targets are written to '.npy' shards of 
+		shardsize samples, described by a 'manifest.json' file, see ShardDataset.
+
+		:param directory: the directory of the shards.
+		:type directory: str.
+		:param chunksize: the number of root rows per chunk (optional).
+		:type chunksize: int.
+		:param shardsize: the number of samples per shard (optional).
+		:type shardsize: int.
+		:param dtype: the dtype of the dataset, such as numpy.float32 (optional).
+		:type dtype: numpy dtype.
+
+		:return: the manifest.
+		:rtype: dict.
+		"""
+		os.makedirs(directory, exist_ok=True)
+		manifest = {"attr": self.get_attr(), "dtype": str(numpy.dtype(dtype or numpy.float64)),
+			"length": 0, "shards": []}
+		buffers = None
+		size = 0
+
+		def write(buffers, size):
+			i = len(manifest["shards"])
+			shard = {"length": size}
+			for name, buffer in zip(("X", "Y"), buffers):
+				shard[name] = "{}_{:05d}.npy".format(name, i)
+				numpy.save(os.path.join(directory, shard[name]), buffer[:size])
+			manifest["shards"].append(shard)
+			manifest["length"] += size
+			return
+
+		for X, Y in self._get_chunks(chunksize, dtype):
+			if buffers is None:
+				buffers = [numpy.empty((shardsize,) + data.shape[1:], dtype=data.dtype)
+					for data in (X, Y)]
+			i = 0
+			while i < len(X):
+				n = min(shardsize - size, len(X) - i)
+				buffers[0][size:size+n] = X[i:i+n]
+				buffers[1][size:size+n] = Y[i:i+n]
+				size += n
+				i += n
+				if size == shardsize:
+					write(buffers, size)
+					size = 0
+
+		if size > 0:
+			write(buffers, size)
+		with open(os.path.join(directory, "manifest.json"), "w") as f:
+			json.dump(manifest, f, indent=1, default=str)
+		return manifest
+
+	# --------------------------------------------- #
+	# --- 4. Prometheus standardisation methods --- #
+	# --------------------------------------------- #
+
+	@staticmethod
+	def _get_moments(data):
+		"""Returns the count, mean and sum of squared deviations of each 
+		column, the columns being the last axis of the data.
+		"""
+		data = numpy.asarray(data, dtype=numpy.float64)
+		data = data.reshape(-1, data.shape[-1])
+		mean = data.mean(axis=0)
+		m2 = ((data - mean) ** 2).sum(axis=0)
+		return {"count": len(data), "mean": mean.tolist(), "m2": m2.tolist()}
+
+	@staticmethod
+	def _merge_moments(a, b):
+		"""Returns the moments of the union of two sets of samples (Chan et al.).
+		"""
+		if a is None or a["count"] == 0:
+			return b
+		if b is None or b["count"] == 0:
+			return a
+		count = a["count"] + b["count"]
+		delta = numpy.subtract(b["mean"], a["mean"])
+		mean = numpy.add(a["mean"], delta * b["count"] / count)
+		m2 = numpy.add(a["m2"], b["m2"]) + delta ** 2 * a["count"] * b["count"] / count
+		return {"count": count, "mean": mean.tolist(), "m2": m2.tolist()}
+
+	def partial_fit(self, X, Y=None):
+		"""Update the standardisation statistics with a chunk of the dataset,
+		the statistics being merged with the ones of the previous chunks.
+
+		:param X: the features.
+		:type X: numpy array of shape (m, t_x, n_x).
+		:param Y: the targets, not standardised if None (optional).
+		:type Y: numpy array.
+
+		.. note:: the chunks should be built before fitting, as get_dataset
+			returns standardised datasets once the statistics are set.
+		"""
+		scaler = dict(self.scaler or {})
+		scaler["features"] = self._merge_moments(
+			scaler.get("features"), self._get_moments(X))
+		if Y is not None:
+			if self.categories is not None:
+				raise ValueError("Categorical targets can not be standardised.")
+			scaler["targets"] = self._merge_moments(
+				scaler.get("targets"), self._get_moments(Y))
+		self.scaler = scaler
+		return
+
+	def fit(self, start=None, end=None, targets=False, chunksize=100000):
+		"""Fit the standardisation statistics of the features, and optionally of 
+		the targets, over a span of the root in a single pass of chunks. 
+		The statistics are part of the attributes, see get_attr and set_attr.
+
+		:param start: the first timestamp of the span (optional).
+		:type start: str or datetime.
+		:param end: the last timestamp of the span (optional).
+		:type end: str or datetime.
+		:param targets: standardise the targets (optional).
+		:type targets: bool.
+		:param chunksize: the number of root rows per chunk (optional).
+		:type chunksize: int.
+		"""
+		if targets and self.categories is not None:
+			raise ValueError("Categorical targets can not be standardised.")
+		self.scaler = None
+		scaler = {}
+		root = self.root
+		self.root = root.loc[start:end]
+		try:
+			for X, Y in self._get_chunks(chunksize):
+				scaler["features"] = self._merge_moments(
+					scaler.get("features"), self._get_moments(X))
+				if targets:
+					scaler["targets"] = self._merge_moments(
+						scaler.get("targets"), self._get_moments(Y))
+		finally:
+			self.root = root
+		self.scaler = scaler
+		return
+
+	def standardise(self, data, name="features"):
+		"""Standardise the features or the targets with the fitted statistics.
+
+		:param data: the features or the targets.
+		:type data: numpy array.
+		:param name: 'features' or 'targets' (optional).
+		:type name: str.
+
+		:return: the standardised data.
+		:rtype: numpy array.
+		"""
+		if self.scaler is None or name not in self.scaler:
+			return data
+		moments = self.scaler[name]
+		mean = numpy.asarray(moments["mean"])
+		std = numpy.sqrt(numpy.asarray(moments["m2"]) / max(moments["count"], 1))
+		data -= mean
+		data /= ( std + 1.0E-8 )
+		return data
+
+# -------------------------------------------- #
+
+class PrometheusStream:
+	"""Class that handles the streaming transform of a prometheus dataset.
+
+	The stream is set from the attributes of a prometheus, see Prometheus.get_attr.
+	The rows of the root are appended one at a time, and the features of the latest
+	timestamp are computed from the last rows only, such that they are equal to the
+	features returned by Prometheus.get_dataset for the same timestamp.
+
+	:attr past: the past horizon window to build the features.
+	:type past: list<int>.
+	:attr features: name of the features that are represented in the root.
+	:type features: tuple(str).
+	:attr columns: name of the columns of the appended rows.
+	:type columns: tuple(str).
+	:attr norm: normalisation methods.
+	:type norm: dict.
+	:attr scaler: the fitted standardisation statistics.
+	:type scaler: dict.
+	:attr root: the last rows of the root.
+	:type root: deque(numpy array).
+	"""
+
+	def __init__(self, attr, columns=None, dtype=None):
+		"""Special method for class object construction.
+
+		:param attr: the attributes of the prometheus.
+		:type attr: dict.
+		:param columns: the columns of the appended rows, defaults to the features (optional).
+		:type columns: tuple(str) or list<str>.
+		:param dtype: the dtype of the features, such as numpy.float32 (optional).
+		:type dtype: numpy dtype.
+		"""
+		self.past = list(attr["past"])
+		self.features = tuple(attr["features"])
+		self.norm = attr["norm"]
+		self.scaler = attr.get("scaler")
+		self.dtype = dtype
+		if columns is None:
+			columns = self.features
+		self.columns = tuple(columns)
+		missing = [column for column in self.features if column not in self.columns]
+		if missing:
+			raise ValueError("Please provide features in the columns: {}".format(missing))
+		self._features = numpy.array(
+			[self.columns.index(column) for column in self.features], dtype=int)
+		self._past = numpy.array(self.past, dtype=int)
+		self._set_index()
+		maxlen = max(self.past) + 1
+		if self.norm is not None and self.norm["method"] in ("pct_change", "log_change"):
+			maxlen += 1
+		self.root = deque(maxlen=maxlen)
+		return
+
+	def __repr__(self):
+		"""Special method for class object representation.
+		"""
+		_repr = []
+		_repr.append("")
+		_repr.append("# --- PrometheusStream --- #")
+		_repr.append("# past .......... = {}".format(self.past))
+		_repr.append("# features ...... = {}".format(self.features))
+		_repr.append("# norm .......... = {}".format(self.norm))
+		_repr.append("# length ........ = {}".format(len(self.root)))
+		_repr.append("# ------------------------- #")
+		_repr.append("")
+		return "\n".join(_repr)
+
+	def __str__(self):
+		"""Special method for class object printable version.
+		"""
+		return self.__repr__()
+
+	def __len__(self):
+		"""Special method for class object length.
+		"""
+		return len(self.root)
+
+	def _set_index(self):
+		"""Set the positional indices of the features, of the normalised features
+		and of their references in the appended rows.
+		"""
+		self._index = None
+		self._ref_index = None
+		if self.norm is None or self.norm["method"] is None:
+			return
+		marker = self.norm["marker"]
+		self._index = Prometheus._get_normalise_index(self.features, marker)
+		if self.norm["method"] in ("pct_change", "log_change"):
+			self._ref_index = self._features[Prometheus._get_normalise_index(
+				self.features, marker, self.norm["ref"])]
+		elif self.norm["method"] == "pvt_change":
+			self._ref_index = numpy.array(Prometheus._get_normalise_index(
+				self.columns, marker, self.norm["ref"]), dtype=int)
+		else:
+			raise ValueError("Please provide a consistent normalisation method.")
+		if self._index and len(self._ref_index) == 0:
+			raise ValueError("Please provide a consistent normalisation reference.")
+		return
+
+	def is_ready(self):
+		"""Returns True if enough rows were appended to compute the features.
+		"""
+		return len(self.root) == self.root.maxlen
+
+	def append(self, row):
+		"""Append a row to the root and returns the features of its timestamp.
+
+		:param row: the row, as a dict or series indexed by the columns, or as an 
+			array ordered as the columns.
+		:type row: dict, pandas series or numpy array.
+
+		:return: the features, or None while the stream is not ready.
+		:rtype: numpy array of shape (t_x, n_x).
+		"""
+		if isinstance(row, (dict, pandas.Series)):
+			row = [row[column] for column in self.columns]
+		row = numpy.asarray(row, dtype=numpy.float64)
+		if row.shape != (len(self.columns),):
+			raise ValueError("Please provide a consistent row.")
+		self.root.append(row)
+		return self.__call__()
+
+	def clear(self):
+		"""Remove all the rows of the root.
+		"""
+		self.root.clear()
+		return
+
+	def __call__(self):
+		"""Special method for class object call, returns the features 
+		of the latest timestamp.
+
+		:return: the features, or None while the stream is not ready.
+		:rtype: numpy array of shape (t_x, n_x).
+		"""
+		if not self.is_ready():
+			return None
+		rows = numpy.array(self.root)
+		last = len(rows) - 1
+		features = rows[last-self._past][:,self._features]
+		index = self._index
+		if self.norm is None or self.norm["method"] is None:
+			pass
+		elif self.norm["method"] == "pct_change":
+			den = rows[last-self._past-1][:,self._ref_index]
+			features[:,index] = 100 * ( features[:,index] / den - 1.0 )
+		elif self.norm["method"] == "pvt_change":
+			den = rows[last,self._ref_index]
+			features[:,index] = 100 * ( features[:,index] / den - 1.0 )
+		elif self.norm["method"] == "log_change":
+			den = rows[last-self._past-1][:,self._ref_index]
+			features[:,index] = 100 * numpy.log( features[:,index] / den )
+		if self.dtype is not None:
+			features = features.astype(self.dtype)
+		if self.scaler is not None and "features" in self.scaler:
+			moments = self.scaler["features"]
+			features -= numpy.asarray(moments["mean"])
+			features /= ( numpy.sqrt(numpy.asarray(moments["m2"]) 
+				/ max(moments["count"], 1)) + 1.0E-8 )
+		return features
@@ -7,6 +7,8 @@ class Wallet():
 
 	:attr qty: the wallet volume.
 	:type qty: float.	
+	:attr locked: the volume reserved by resting orders.
+	:type locked: float.
 	:attr asset: the asset name.
 	:type asset: str.
 	:attr name: the name of the wallet.
@@ -28,6 +30,7 @@ class Wallet():
 		assert(isinstance(asset, str))		
 		
 		self.qty = qty
+		self.locked = 0.0
 		self.name = name		
 		self.asset = asset
 		self._qty_start = qty			
@@ -40,6 +43,7 @@ class Wallet():
 		msg.append("# {}: #".format(self.name))
 		msg.append("# asset ... = {}".format(self.asset))
 		msg.append("# qty ..... = {}".format(self.qty))
+		msg.append("# locked .. = {}".format(self.locked))
 		return "\n".join(msg)
 
 	def __str__(self):
@@ -53,6 +57,24 @@ class Wallet():
 		self.qty = self.qty_initial
 		return 
 
+	@property
+	def available(self):
+		"""The volume not reserved by resting orders.
+		"""
+		return self.qty - self.locked
+
+	def lock(self, qty):
+		"""Reserve qty of the wallet for a resting order.
+		"""
+		self.locked += qty
+		return qty
+
+	def unlock(self, qty):
+		"""Release qty reserved for a resting order.
+		"""
+		self.locked = max(self.locked - qty, 0.0)
+		return qty
+
 	def minus(self, qty):
 		"""Sell qty from the wallet.
 		"""
@@ -2,7 +2,7 @@
 # coding=utf-8
 
 import numpy
-import torch
+from itertools import islice
 from collections import deque, OrderedDict
 
 
@@ -22,16 +22,48 @@ class Window():
 	:type root: deque(list)
 	:attr norm: the normalisation methods.
 	:type norm: dict.
+	:attr periods: the aggregation periods in number of base samples.
+	:type periods: list<int>.
+	:attr bars: the aggregated open/high/low/close/avg bars per period.
+	:type bars: dict(int, deque(numpy array)).
+	:attr backend: the output backend, 'torch' or 'numpy'.
+	:type backend: str.
+	:attr dtype: the output dtype, 'float64', 'float32' or 'bfloat16'.
+	:type dtype: str.
+
+	.. note:: torch is only imported by the torch backend, on first use.
 	"""
 
-	def __init__(self, lookback, maxlen=None):
+	FIELDS = ("open", "high", "low", "close", "avg")
+
+	BACKENDS = ("torch", "numpy")
+
+	DTYPES = ("float64", "float32", "bfloat16")
+
+	def __init__(self, lookback, maxlen=None, periods=None, backend="torch",
+		dtype="float32"):
 		"""Special method for class object construction.
 
 		:param lookback: the look-back horizon.
 		:type lookback: int.
 		:param maxlen: the maximum length of the root (optional). 
 		:type maxlen: int.
+		:param periods: the aggregation periods, as multiples of the 
+			base period, for the multi-resolution mode (optional).
+		:type periods: list<int>.
+		:param backend: the output backend, 'torch' or 'numpy' (optional).
+		:type backend: str.
+		:param dtype: the output dtype (optional).
+		:type dtype: str.
 		"""
+		if backend not in self.BACKENDS:
+			raise ValueError("Unsupported backend {}".format(backend))
+		if dtype not in self.DTYPES:
+			raise ValueError("Unsupported dtype {}".format(dtype))
+		if backend == "numpy" and dtype == "bfloat16":
+			raise ValueError("Unsupported dtype {} for numpy".format(dtype))
+		self.backend = backend
+		self.dtype = dtype
 		self.collen = None
 		self.columns = None
 		self.lookback = lookback
@@ -41,6 +73,18 @@ class Window():
 			self.maxlen = maxlen
 		self.root = deque(maxlen=self.maxlen)
 		self.norm = []
+		self._schema = False
+		self._output = None
+		self._shared = False
+		self._rows = None
+		self._work = None
+		self.periods = self._check_periods(periods)
+		self.bars = {}
+		self._bars_norm = []
+		self._bars_state = {}
+		for period in self.periods:
+			self.bars[period] = deque(maxlen=self.maxlen)
+			self._bars_state[period] = None
 		return
 
 	def __repr__(self):
@@ -52,7 +96,10 @@ class Window():
 			"collen": self.collen,
 			"maxlen": self.maxlen,
 			"root": self.root,
-			"norm": self.norm}
+			"norm": self.norm,
+			"periods": self.periods,
+			"backend": self.backend,
+			"dtype": self.dtype}
 		return _repr
 
 	def __str__(self):
@@ -68,26 +115,80 @@ class Window():
 		"""
 		return self.root.__len__()
 
-	def __call__(self):
+	def __call__(self, out=None):
 		"""Special method for class object function-like call.
+
+		The output is cached until the next change of the root. The returned 
+		output is read-only with the numpy backend, and must not be modified 
+		in place with the torch backend. With out, the output is normalised
+		in a reused internal buffer and copied to out, without allocation.
+
+		:param out: the buffer to copy the output to (optional).
+		:type out: torch tensor or numpy array.
 		"""
 
+		# Check the cached output.
+		if self._output is not None:
+			if out is None and self._shared:
+				self._output = self._asowned(self._output)
+				self._shared = False
+			return self._copyto(out, self._output)
+
+		# Check the multi-resolution mode.
+		if self.periods:
+			self._output = self.get_bars()
+			return self._copyto(out, self._output)
+
 		# Check the length of the current root.
 		if self.__len__() <= self.lookback:
 			return None
 
-		# Check the user specified return data type.
-		data = self.astorch()
-
-		# Normalise the data.
+		# Normalise the data in the internal buffer.
+		data = self._work_buffer()
 		for norm in self.norm:
 			data = self.normalise(data, norm)
-
-		# Update the data.
-		data = data[-self.lookback:,:]
-		data = data.unsqueeze(0)
-
-		# Returns the data.
+		data = data[None,-self.lookback:,:]
+
+		# Copy the data to out, or return an owned output.
+		if out is not None:
+			self._output = data
+			self._shared = True
+			return self._copyto(out, data)
+		self._output = self._asowned(data)
+		self._shared = False
+		return self._output
+
+	def _work_buffer(self):
+		"""Returns the internal buffer filled with the last lookback + 1
+		rows of the root, in the dtype of the normalisation.
+		"""
+		shape = (self.lookback + 1, len(self.root[-1]))
+		if self._rows is None or self._rows.shape != shape:
+			self._rows = numpy.empty(shape)
+			self._work = None
+		for i, row in enumerate(islice(self.root, len(self.root) - shape[0], None)):
+			self._rows[i] = row
+		if self.backend == "torch":
+			import torch
+			if self._work is None:
+				self._work = torch.empty(shape, dtype=torch.float64 
+					if self.dtype == "float64" else torch.float32)
+			self._work.copy_(torch.from_numpy(self._rows))
+			return self._work
+		if self.dtype == "float64":
+			return self._rows
+		if self._work is None:
+			self._work = numpy.empty(shape, dtype=numpy.float32)
+		self._work[:] = self._rows
+		return self._work
+
+	def _asowned(self, data):
+		"""Returns a copy of the data with the output dtype, read-only with numpy.
+		"""
+		if self.backend == "torch":
+			return self.asoutput(data.clone())
+		data = data.copy()
+		data.flags.writeable = False
 		return data
 
 	# ---------------------------- #
@@ -107,16 +208,94 @@ class Window():
 
 		# Add columns if required.
 		if self.columns is None:
-			self.columns = list(x.keys())
-			self.collen = len(self.columns)
-			for i, norm in enumerate(self.norm):
-				self.norm[i] = self.set_idx_norm(norm)
+			self.set_columns(x.keys())
 		else:
 			pass
 
 		# Append values to root.
 		self.root.append(list(x.values()))
+		self._output = None
 
+		# Update the aggregated bars.
+		if self.periods:
+			self.append_bars(self.root[-1])
+
+		return
+
+	def append_array(self, x, columns=None):
+		"""Add the array x to the right side of the root.
+
+		The column schema is validated on the first call only (or when 
+		columns are given). The row is copied to the root, such that the 
+		caller can reuse the same buffer for the next rows.
+
+		:param x: data to append, ordered as the columns.
+		:type x: numpy array of shape (collen,).
+		:param columns: the column names of x (optional once set).
+		:type columns: list<str>.
+		"""
+
+		# Validate the schema once.
+		if not self._schema or columns is not None:
+			self.check_schema(columns, len(x))
+
+		# Append a copy of the values to root.
+		x = numpy.array(x, dtype=numpy.float64)
+		self.root.append(x)
+		self._output = None
+
+		# Update the aggregated bars.
+		if self.periods:
+			self.append_bars(x)
+
+		return
+
+	def append_history(self, history):
+		"""Add the current sample of the history to the right side of the root.
+
+		:param history: the history, stepped at the sample to append.
+		:type history: History.
+		"""
+		x = history.asarray()
+		if not self._schema:
+			self.check_schema(list(history.columns), len(x))
+		self.append_array(x)
+		return
+
+	def set_columns(self, columns):
+		"""Set the columns and the normalisation indices.
+
+		:param columns: the column names.
+		:type columns: list<str>.
+		"""
+		self.columns = list(columns)
+		self.collen = len(self.columns)
+		for norm in self.norm:
+			self._add_bars_norm(norm)
+		for i, norm in enumerate(self.norm):
+			self.norm[i] = self.set_idx_norm(norm)
+		return
+
+	def check_schema(self, columns, collen):
+		"""Check the column schema of the array samples.
+
+		:param columns: the column names of the samples.
+		:type columns: list<str>.
+		:param collen: the length of the samples.
+		:type collen: int.
+		"""
+		if columns is not None:
+			if self.columns is None:
+				self.set_columns(columns)
+			elif list(columns) != self.columns:
+				raise ValueError("Please provide columns consistent with {}.".format(
+					self.columns))
+		if self.columns is None:
+			raise ValueError("Please provide the columns of the first array.")
+		if collen != self.collen:
+			raise ValueError("Please provide arrays of length {}.".format(
+				self.collen))
+		self._schema = True
 		return
 
 	def clear(self):
@@ -124,6 +303,10 @@ class Window():
 		leaving it with length 0.
 		"""
 		self.root.clear()
+		self._output = None
+		for period in self.periods:
+			self.bars[period].clear()
+			self._bars_state[period] = None
 		return
 
 	def extend(self, iterable):
@@ -132,13 +315,18 @@ class Window():
 		"""
 		for item in iterable:
 			self.root.extend(item)
+		self._output = None
 		return
 
 	def pop(self):
 		"""Remove and return an element 
 		from the right side of the root.
 		If no elements are present, raises an IndexError.		
+
+		.. note:: the aggregated bars of the multi-resolution mode are
+			left untouched.
 		"""
+		self._output = None
 		return self.root.pop()
 
 	def popleft(self):
@@ -146,6 +334,7 @@ class Window():
 		from the left side of the deque.
 		If no elements are present, raises an IndexError.		
 		"""
+		self._output = None
 		return self.root.popleft()
 
 	# --------------------------- #
@@ -160,8 +349,9 @@ class Window():
 	def astorch(self):
 		"""Returns the root as a torch tensor.
 		"""
+		import torch
 		try:
-			return torch.Tensor(list(self.root)[-self.lookback-1:])
+			return torch.Tensor(self.asnumpy())
 		except TypeError:
 			print("TypeError in astorch method.")
 			return None
@@ -170,11 +360,59 @@ class Window():
 		"""Returns the root as a numpy array.
 		"""
 		try:
-			return numpy.asarray(list(self.root)[-self.lookback-1:])
+			start = max(len(self.root)-self.lookback-1, 0)
+			return numpy.asarray(list(islice(self.root, start, None)),
+				dtype=numpy.float64)
 		except TypeError:
 			print("TypeError in astorch method.")
 			return
 
+	def asbackend(self, data):
+		"""Returns the data as a sample of the output backend.
+
+		The data is normalised in float64 for a float64 output 
+		and in float32 otherwise.
+
+		:param data: the data.
+		:type data: numpy array.
+
+		:return: the data.
+		:rtype: torch tensor or numpy array.
+		"""
+		if self.backend == "torch":
+			import torch
+			if self.dtype == "float64":
+				return torch.tensor(data, dtype=torch.float64)
+			return torch.tensor(data, dtype=torch.float32)
+		if self.dtype == "float64":
+			return data.astype(numpy.float64)
+		return data.astype(numpy.float32)
+
+	def asoutput(self, data):
+		"""Returns the normalised data with the output dtype.
+
+		:param data: the normalised data.
+		:type data: torch tensor or numpy array.
+
+		:return: the data.
+		:rtype: torch tensor or numpy array.
+		"""
+		if self.dtype == "bfloat16":
+			import torch
+			return data.to(torch.bfloat16)
+		return data
+
+	def _copyto(self, out, data):
+		"""Returns the data, copied to out if provided.
+		"""
+		if out is None or data is None:
+			return data
+		if self.backend == "torch":
+			out.copy_(data)
+		else:
+			numpy.copyto(out, data, casting="same_kind")
+		return out
+
 	def get(self):
 		"""Process the current data sample.
 		"""
@@ -222,32 +460,38 @@ class Window():
 
 		# Set the normalisation index and reference.
 		if self.columns is not None:
-			norm = self.set_index_norm(norm)
+			self._add_bars_norm(norm)
+			norm = self.set_idx_norm(norm)
 
 		# Append the normalisation method.
 		self.norm.append(norm)
+		self._output = None
 
 		return
 
-	def set_idx_norm(self, norm):
+	def set_idx_norm(self, norm, columns=None):
 		"""Returns the normalisation method with updated index and reference.
 
 		:param norm: the normalisation method.
 		:type norm: dict.
+		:param columns: the columns to index (optional).
+		:type columns: list<str>.
 
 		:return: the updated normalisation method.
 		:rtype: dict.
 		"""
+		if columns is None:
+			columns = self.columns
 
 		# Assign the indices.
 		idx = []		
-		for i, column in enumerate(self.columns):
+		for i, column in enumerate(columns):
 			if norm["marker"] in column:
 				idx.append(i)
 
 		# Assign the reference.
 		ref = []
-		for i, column in enumerate(self.columns):
+		for i, column in enumerate(columns):
 			if norm["ref"] is None:
 				if norm["marker"] in column:
 					ref.append(i)
@@ -283,6 +527,104 @@ class Window():
 			raise ValueError("Unsupported method {}".format(norm["method"]))
 		return data
 
+	# --------------------------------------- #
+	# --- Window multi-resolution methods --- #
+	# --------------------------------------- #
+
+	def _check_periods(self, periods):
+		"""Check the aggregation periods.
+		"""
+		if periods is None:
+			return []
+		periods = sorted(set(periods))
+		for period in periods:
+			if not isinstance(period, int) or period < 1:
+				raise ValueError("Please provide periods as positive int.")
+		return periods
+
+	def bars_columns(self):
+		"""Returns the columns of the aggregated bars.
+
+		:return: the column names, as '<column>_<field>'.
+		:rtype: list<str>.
+		"""
+		columns = []
+		for column in self.columns:
+			for field in self.FIELDS:
+				columns.append("{}_{}".format(column, field))
+		return columns
+
+	def _add_bars_norm(self, norm):
+		"""Add the normalisation method for the aggregated bars.
+
+		The reference column, if any, is taken on the close field.
+
+		:param norm: the normalisation method, with the reference as name.
+		:type norm: dict.
+		"""
+		if not self.periods:
+			return
+		bars_norm = dict(norm)
+		if norm["ref"] is not None:
+			bars_norm["ref"] = "{}_close".format(norm["ref"])
+		bars_norm = self.set_idx_norm(bars_norm, self.bars_columns())
+		self._bars_norm.append(bars_norm)
+		return
+
+	def append_bars(self, x):
+		"""Update the aggregated bars with a base period sample.
+
+		Each period keeps a running open/high/low/close/sum state; 
+		a bar is pushed once the period count is reached.
+
+		:param x: the values of the base period sample.
+		:type x: list or numpy array.
+		"""
+		x = numpy.asarray(x, dtype=numpy.float64)
+		for period in self.periods:
+			state = self._bars_state[period]
+			if state is None:
+				state = [0, x.copy(), x.copy(), x.copy(), x, x.copy()]
+				self._bars_state[period] = state
+			else:
+				numpy.maximum(state[2], x, out=state[2])
+				numpy.minimum(state[3], x, out=state[3])
+				state[4] = x
+				state[5] += x
+			state[0] += 1
+			if state[0] == period:
+				bar = numpy.empty((self.collen, len(self.FIELDS)))
+				bar[:,0] = state[1]
+				bar[:,1] = state[2]
+				bar[:,2] = state[3]
+				bar[:,3] = state[4]
+				bar[:,4] = state[5] / period
+				self.bars[period].append(bar.ravel())
+				self._bars_state[period] = None
+		return
+
+	def get_bars(self):
+		"""Returns the normalised look-back of every aggregation period.
+
+		:return: the stacked bars of shape (periods, lookback, 5 * collen),
+			or None if a period has not enough bars yet.
+		:rtype: torch tensor or numpy array.
+		"""
+		batch = []
+		for period in self.periods:
+			bars = self.bars[period]
+			if len(bars) <= self.lookback:
+				return None
+			data = self.asbackend(numpy.asarray(
+				list(islice(bars, len(bars)-self.lookback-1, None))))
+			for norm in self._bars_norm:
+				data = self.normalise(data, norm)
+			batch.append(data[None,-self.lookback:,:])
+		if self.backend == "torch":
+			import torch
+			return self.asoutput(torch.cat(batch))
+		return numpy.concatenate(batch)
+
 	def _normalise_normal(self, data, index, mean, std):
 		data[:,index] = ( data[:,index] - mean ) / ( std + 1.0E-8 )
 		return data
@@ -296,7 +638,7 @@ class Window():
 	def _normalise_pct_change(self, data, index, ref):
 		num = data[1:,index]
 		den = data[0:-1,ref]
-		if len(den.size()) == 1:
+		if den.ndim == 1:
 			den = den.reshape(-1, 1)
 		data[1:,index] = 100.0 * ( num / ( den + 1.0E-12 ) - 1 )
 		return data
@@ -304,7 +646,11 @@ class Window():
 	def _normalise_log_change(self, data, index, ref):
 		num = data[1:,index]
 		den = data[0:-1,ref]
-		if len(den.size()) == 1:
+		if den.ndim == 1:
 			den = den.reshape(-1, 1)
-		data[1:,index] = 100.0 * torch.log( num / ( den + 1.0E-12 ) )
+		if self.backend == "torch":
+			import torch
+			data[1:,index] = 100.0 * torch.log( num / ( den + 1.0E-12 ) )
+		else:
+			data[1:,index] = 100.0 * numpy.log( num / ( den + 1.0E-12 ) )
 		return data
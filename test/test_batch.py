@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import time
+import numpy
+import pandas
+
+from njord import Batch
+
+
+if __name__ == "__main__":
+
+	# Create a random root.
+	rng = numpy.random.default_rng(0)
+	length = 500
+	root = pandas.DataFrame({
+		"price_avg_#t": 100.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"price_low_#t": 90.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"volume": 10.0 + rng.random(length)},
+		index=pandas.date_range("2020-01-01", periods=length, freq="min"))
+	root.index.name = "time"
+	root.iloc[100, 2] = numpy.nan
+
+	# Set the batch.
+	batch = Batch(root, lk=10, la=2)
+	print(batch)
+
+	# Compare the numpy and pandas engines.
+	for method in ("pvt", "pct", None):
+		timer_start = time.time()
+		X, Y = batch.build(method=method, engine="numpy")
+		elapsed_time = int( 1000 * ( time.time() - timer_start ) )
+		X_pandas, Y_pandas = batch.build(method=method, engine="pandas")
+		assert numpy.allclose(X, X_pandas) and numpy.allclose(Y, Y_pandas)
+		print("method = {}, X = {}, Y = {}, elapsed time = {} [ms]".format(
+			method, X.shape, Y.shape, elapsed_time))
+
+	# Compare the serial and parallel builds.
+	X, Y = batch.build(target="price_avg_#t", method="pvt")
+	X_parallel, Y_parallel = batch.build(target="price_avg_#t", method="pvt", workers=2)
+	assert numpy.array_equal(X, X_parallel) and numpy.array_equal(Y, Y_parallel)
+	print("parallel build: X = {}, Y = {}".format(X_parallel.shape, Y_parallel.shape))
+
+	# Compare the shuffled mini-batches with the built batch, on a short root
+	# such that shuffled chunks of consecutive rows occur.
+	assert numpy.array_equal(batch._take(numpy.arange(10), numpy.array([3, 7, 5])), [3, 7, 5])
+	short = Batch(root.iloc[:20], lk=3, la=1)
+	X, Y = short.build(method="pvt")
+	values, tvalues = short._get_values(short._check_target(None))
+	rows = short.get_rows(values, tvalues, "pvt")
+	for seed in range(20):
+		index = numpy.searchsorted(rows, numpy.random.default_rng(seed).permutation(rows))
+		i = 0
+		for X_batch, Y_batch in short.batches(3, method="pvt", shuffle=True, seed=seed):
+			assert numpy.array_equal(X_batch, X[index[i:i+len(X_batch)]])
+			assert numpy.array_equal(Y_batch, Y[index[i:i+len(Y_batch)]])
+			i += len(X_batch)
+		assert i == len(X)
+	print("shuffled mini-batches: ok")
+
+	# Compare a batch extended chunk by chunk with the full build.
+	for method in ("pvt", "pct"):
+		X, Y = batch.build(target="price_avg_#t", method=method)
+		extended = Batch(root.iloc[:200], lk=10, la=2)
+		extended.build(target="price_avg_#t", method=method)
+		for start in range(200, length, 37):
+			X_extended, Y_extended = extended.extend(root.iloc[start:start+37])
+		assert numpy.allclose(X, X_extended) and numpy.allclose(Y, Y_extended)
+		assert extended.root.equals(root)
+	print("extended batch: X = {}, Y = {}".format(X_extended.shape, Y_extended.shape))
+
+	# Check the lengths of the walk-forward splits and the gaps between them.
+	purge, embargo = extended._get_la_max(), extended._get_lk_max() + 1
+	for val in (0, 20):
+		for train in (None, 100):
+			for split in extended.splits(3, test=50, val=val, train=train):
+				train_slice, val_slice, test_slice = split
+				assert test_slice.stop - test_slice.start == 50
+				assert val_slice.stop - val_slice.start == val
+				if val > 0:
+					assert test_slice.start - val_slice.stop == purge + embargo
+					assert val_slice.start - train_slice.stop == purge + embargo
+				else:
+					assert test_slice.start - train_slice.stop == purge + embargo
+				if train is not None:
+					assert train_slice.stop - train_slice.start == train
+			assert test_slice.stop == len(X_extended)
+	try:
+		list(extended.splits(3, test=150, val=20, train=100))
+		raise AssertionError("inconsistent split sizes")
+	except ValueError:
+		pass
+	print("walk-forward splits: ok")
+
+	# Use dilated and geometric steps as lookahead steps.
+	assert Batch.dilated(9, 4) == [0, 4, 8] and Batch.dilated(9, 4, start=1) == [1, 5]
+	assert Batch.geometric(8) == [0, 1, 2, 4, 8] and Batch.geometric(8, start=1) == [1, 2, 4, 8]
+	steps = Batch(root, lk=Batch.geometric(8), la=Batch.geometric(4, start=1))
+	X, Y = steps.build(method="pvt")
+	assert Y.shape[1] == 3
+	steps = Batch(root, lk=Batch.dilated(8, 2), la=Batch.dilated(8, 2, start=1))
+	X, Y = steps.build(method="pvt")
+	X_pandas, Y_pandas = steps.build(method="pvt", engine="pandas")
+	assert numpy.allclose(X, X_pandas) and numpy.allclose(Y, Y_pandas)
+	print("lookahead steps: X = {}, Y = {}".format(X.shape, Y.shape))
+
+	# Align the roots of two symbols with missing rows on time.
+	roots = {"a": root.iloc[:100], "b": root.iloc[:100].drop(root.index[[30, 31, 70]])}
+	symbols = Batch(roots, lk=3, la=1)
+	X, Y = symbols.build(method="pvt")
+	for i, symbol in enumerate(("a", "b")):
+		X_symbol, Y_symbol = Batch(roots[symbol].reindex(root.index[:100]), 
+			lk=3, la=1).build(method="pvt")
+		assert numpy.array_equal(X[symbols.symbol_id == i], X_symbol)
+		assert numpy.array_equal(Y[symbols.symbol_id == i], Y_symbol)
+	try:
+		list(symbols.splits(3, test=20))
+		raise AssertionError("multi-symbol splits")
+	except ValueError:
+		pass
+	print("multi-symbol batch: X = {}, Y = {}".format(X.shape, Y.shape))
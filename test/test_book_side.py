@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import time
+import zlib
+import numpy
+
+from njord.exchange import Exchange
+from njord.orderbook import BookSide
+
+
+if __name__ == "__main__":
+
+	# Set, update and remove levels, beyond the initial capacity.
+	rng = numpy.random.default_rng(0)
+	for side in ("bid", "ask"):
+		book = BookSide(side, [100.0, 101.0], [1.0, 2.0], capacity=4)
+		levels = {100.0: 1.0, 101.0: 2.0}
+		timer_start = time.time()
+		for i in range(10000):
+			price = float(90.0 + rng.integers(0, 40) * 0.5)
+			qty = float(rng.integers(0, 3))
+			assert book.set(price, qty) == levels.get(price, 0.0)
+			if qty > 0:
+				levels[price] = qty
+			else:
+				levels.pop(price, None)
+		elapsed_time = int( 1000 * ( time.time() - timer_start ) )
+		prices = sorted(levels, reverse=side == "bid")
+		assert numpy.array_equal(book.prices, prices)
+		assert numpy.array_equal(book.qtys, [levels[price] for price in prices])
+		assert book.best() == (prices[0], levels[prices[0]])
+		print(book, "elapsed time = {} [ms]".format(elapsed_time))
+
+	# Apply deltas and roll them back.
+	book = BookSide("ask", [100.0, 100.5, 101.0], [1.0, 1.0, 1.0])
+	checksum = book.checksum()
+	undo = book.apply([100.5, 99.5, 100.5, 100.0], [0.0, 3.0, 2.0, 4.0])
+	assert list(book.prices) == [99.5, 100.0, 100.5, 101.0]
+	assert list(book.qtys) == [3.0, 4.0, 2.0, 1.0]
+	book.rollback(undo)
+	assert list(book.prices) == [100.0, 100.5, 101.0] and book.checksum() == checksum
+	book.reset([], [])
+	assert len(book) == 0 and book.best() is None
+	print("deltas: ok")
+
+	# Resync an exchange side whose checksum does not match.
+	asks = ([100.0, 100.5, 101.0], [1.0, 1.0, 1.0])
+	exchange = Exchange("kraken", "BTCEUR", 1.0, 1000.0)
+	exchange.update(0, asks[0], asks[1], [99.5, 99.0], [1.0, 1.0])
+	checksum = BookSide("ask", [100.0, 101.0], [1.0, 1.0]).checksum()
+	try:
+		exchange.apply_deltas(1, "ask", [100.5, 100.0], [0.0, 5.0], checksum=checksum)
+		raise AssertionError("out of sync")
+	except ValueError as error:
+		print(error)
+	assert exchange.get_checksum("ask") == BookSide("ask", *asks).checksum()
+	assert exchange.get_top("ask") == (100.0, 1.0) and exchange.timestamp == 0
+	exchange.resync_hook = lambda side: ([100.0, 101.0], [1.0, 1.0])
+	exchange.apply_deltas(1, "ask", [100.5, 100.0], [0.0, 5.0], checksum=checksum)
+	assert list(exchange.get_book("ask")[0]) == [100.0, 101.0]
+	assert list(exchange.get_book("ask")[1]) == [1.0, 1.0] and exchange.timestamp == 1
+
+	# Check the deltas with the checksum of the platform.
+	exchange.checksum_fn = lambda side, prices, qtys: zlib.crc32(
+		":".join("{}:{}".format(p, q) for p, q in zip(prices, qtys)).encode())
+	checksum = zlib.crc32("100.0:2.0:101.0:1.0".encode())
+	assert exchange.get_checksum("ask") != checksum
+	exchange.apply_deltas(2, "ask", [100.0], [2.0], checksum=checksum)
+	assert exchange.get_checksum("ask") == checksum
+	assert list(exchange.get_book("ask")[1]) == [2.0, 1.0]
+	print("resync: ok")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import numpy
+import pandas
+import shutil
+import tempfile
+
+from njord import Batch, Cache
+
+
+if __name__ == "__main__":
+
+	# Create a random root.
+	rng = numpy.random.default_rng(0)
+	length = 200
+	root = pandas.DataFrame({
+		"price_avg_#t": 100.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"price_low_#t": 90.0 + rng.normal(0.0, 1.0, length).cumsum()},
+		index=pandas.date_range("2020-01-01", periods=length, freq="min"))
+	root.index.name = "time"
+
+	# Set the cache.
+	directory = tempfile.mkdtemp(prefix="njord_")
+	cache = Cache(directory, maxsize=1.0E+6)
+	print(cache)
+
+	# Build the batch twice, the second build is read from the cache.
+	batch = Batch(root, lk=10, la=2)
+	X, Y = batch.build(target="price_avg_#t", method="pct", cache=cache)
+	X_cached, Y_cached = batch.build(target="price_avg_#t", method="pct", cache=cache)
+	assert isinstance(X_cached, numpy.memmap)
+	assert numpy.array_equal(X, X_cached) and numpy.array_equal(Y, Y_cached)
+	print(cache)
+
+	# The engines are cached separately.
+	X_pandas, Y_pandas = batch.build(target="price_avg_#t", method="pct", 
+		engine="pandas", cache=cache)
+	X_expected, Y_expected = batch.build(target="price_avg_#t", method="pct", 
+		engine="pandas")
+	assert numpy.array_equal(X_pandas, X_expected) and Y_pandas.shape == Y_expected.shape
+	assert len(os.listdir(directory)) == 4
+
+	# Evict the least recently used datasets.
+	cache.maxsize = 0
+	cache.evict()
+	assert cache.size() == 0
+	cache.clear()
+	print(cache)
+	shutil.rmtree(directory)
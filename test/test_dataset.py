@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import os
+import random
+import pandas
+
+from njord import History, Window, WindowDataset
+
+
+if __name__ == "__main__":
+
+	# Create a random history.
+	df = []
+	price = 100.0
+	for i in range(100):
+		price += random.normalvariate(0.0, 1.0)
+		data = {
+			"price_avg_#t": price,
+			"price_low_#t": price - 1.0,
+			"price_high_#t": price + 1.0
+		}
+		df.append(data)
+	index = pandas.date_range("2020-01-01", periods=100, freq="10min")
+	df = pandas.DataFrame(df, index=index.astype("datetime64[ns]"))
+	history = History(df, name="random")
+
+	# Set the window.
+	window = Window(lookback=5, backend="numpy")
+	window.add_norm("#t", "pct_change", ref="price_avg_#t")
+
+	# Set the dataset.
+	dataset = WindowDataset(window, history, target="price_avg_#t", lookahead=2)
+	print(dataset)
+
+	# Display the first sample.
+	x, y = dataset[0]
+	print(x)
+	print(y)
+
+	# Display the shuffled indices.
+	print(dataset.indices(shuffle=True, seed=0)[:10])
+
+	# Remove the memory-mapped root.
+	path = dataset.path
+	dataset.close()
+	assert not os.path.exists(path) and window.columns is None
+
+	# Remove the memory-mapped root at the exit of a with block.
+	with WindowDataset(window, history, target="price_avg_#t") as dataset:
+		path = dataset.path
+		assert os.path.exists(path)
+	assert not os.path.exists(path)
+
+	# Remove the memory-mapped root at garbage collection.
+	dataset = WindowDataset(window, history, target="price_avg_#t")
+	path = dataset.path
+	del dataset
+	assert not os.path.exists(path)
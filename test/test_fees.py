@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import numpy
+import pandas
+
+from njord.exchange import Exchange
+
+
+if __name__ == "__main__":
+
+	# Trade a quote volume of 10000 per day during 10 days.
+	exchange = Exchange("kraken", "BTCEUR", 0.0, 1.0E+9)
+	start = numpy.datetime64("2020-01-01T00:00")
+	fees = []
+	for day in range(10):
+		exchange.update(start + numpy.timedelta64(day, "D"), [100.0], [1.0E+6], [99.0], [1.0E+6])
+		exchange.buy_market(100.0)
+		fees.append(exchange.fees)
+	print(exchange)
+
+	# Check the tier change after crossing the 50000 threshold.
+	assert numpy.isclose(exchange.volume, 100000.0)
+	assert numpy.allclose(fees, [0.0016] * 4 + [0.0014] * 5 + [0.0012])
+
+	# Check the fall back after the eviction of the oldest trades.
+	exchange.update(start + numpy.timedelta64(35, "D"), [100.0], [1.0E+6], [99.0], [1.0E+6])
+	assert numpy.isclose(exchange.volume, 40000.0) and numpy.isclose(exchange.fees, 0.0016)
+	exchange.update(pandas.Timestamp("2020-02-10"), [100.0], [1.0E+6], [99.0], [1.0E+6])
+	assert exchange.volume == 0.0 and numpy.isclose(exchange.fees, 0.0016)
+	print("rolling volume: ok")
+
+	# Check the exact boundaries of the top tiers.
+	for platform, top in (("kraken", 10.0E+6), ("bitfinex", 7.5E+6)):
+		exchange = Exchange(platform, "BTCEUR", 0.0, 1.0)
+		exchange.volume = top
+		assert exchange.update_fees() == 0.0
+		exchange.volume = top - 1.0
+		assert numpy.isclose(exchange.update_fees(), 0.0002)
+	print("tiers: ok")
+
+	# Check the timestamps consistent with the fees window.
+	exchange = Exchange("kraken", "BTCEUR", 0.0, 1.0E+9)
+	exchange.update(1.5, [100.0], [1.0E+6], [99.0], [1.0E+6])
+	try:
+		exchange.buy_market(100.0)
+		raise AssertionError("numeric timestamps")
+	except ValueError as error:
+		print(error)
+	exchange = Exchange("kraken", "BTCEUR", 0.0, 1.0E+9, fees_window=30.0)
+	for t in (1.5, 20.0, 40.0):
+		exchange.update(t, [100.0], [1.0E+6], [99.0], [1.0E+6])
+		exchange.buy_market(100.0)
+	assert numpy.isclose(exchange.volume, 20000.0)
+	exchange = Exchange("kraken", "BTCEUR", 0.0, 1.0E+9)
+	for t in ("2020-01-01", "2020-01-20", "2020-02-10"):
+		exchange.update(t, [100.0], [1.0E+6], [99.0], [1.0E+6])
+		exchange.buy_market(100.0)
+	assert numpy.isclose(exchange.volume, 20000.0)
+	print("timestamps: ok")
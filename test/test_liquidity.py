@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import time
+import numpy
+
+from njord.exchange import Exchange
+
+
+def sweep(prices, qtys, base_qty):
+	"""Returns the quote qty, the filled base qty and the worst price of
+	a fill, level by level.
+	"""
+	trade, qty, price = 0.0, 0.0, prices[0]
+	for p, q in zip(prices, qtys):
+		if qty >= base_qty:
+			break
+		fill = min(q, base_qty - qty)
+		trade += p * fill
+		qty += fill
+		price = p
+	return trade, qty, price
+
+
+if __name__ == "__main__":
+
+	# Compare the sweeps with a level by level fill on random books.
+	rng = numpy.random.default_rng(0)
+	exchange = Exchange("kraken", "BTCEUR", 1.0E+6, 1.0E+9)
+	for i in range(200):
+		levels = int(rng.integers(1, 20))
+		ask_p = 100.0 + numpy.cumsum(rng.integers(1, 5, levels) * 0.5)
+		bid_p = 100.0 - numpy.cumsum(rng.integers(1, 5, levels) * 0.5)
+		ask_q = rng.integers(1, 8, levels) * 0.25
+		bid_q = rng.integers(1, 8, levels) * 0.25
+		exchange.update(i, ask_p.tolist(), ask_q.tolist(), bid_p.tolist(), bid_q.tolist())
+
+		# Check the cumulative depth.
+		prices, depth, quote = exchange.get_depth("ask")
+		assert numpy.array_equal(prices, ask_p) and numpy.allclose(depth, numpy.cumsum(ask_q))
+		assert numpy.allclose(quote, numpy.cumsum(ask_p * ask_q))
+
+		# Check qties inside the levels, at their exact boundaries and beyond.
+		depth = numpy.cumsum(ask_q)
+		qtys = numpy.concatenate([rng.random(5) * depth[-1], depth, [depth[-1] + 1.0]])
+		for base_qty in qtys:
+			trade, qty, price = sweep(ask_p, ask_q, base_qty)
+			cost, fees, final_qty, p = exchange.check_ask_qty(base_qty)
+			assert numpy.isclose(cost, trade * ( 1 + exchange.fees ))
+			assert numpy.isclose(fees, trade * exchange.fees)
+			assert numpy.isclose(final_qty, qty) and p == price
+		depth = numpy.cumsum(bid_q)
+		qtys = numpy.concatenate([rng.random(5) * depth[-1], depth, [depth[-1] + 1.0]])
+		for base_qty in qtys:
+			trade, qty, price = sweep(bid_p, bid_q, base_qty)
+			gain, fees, final_qty, p = exchange.check_bid_qty(base_qty)
+			assert numpy.isclose(gain, trade * ( 1 - exchange.fees ))
+			assert numpy.isclose(final_qty, qty) and p == price
+
+	# Check an empty side.
+	exchange.update(200, [], [], [99.0], [1.0])
+	assert exchange.check_ask_qty(1.0)[2] == 0.0
+	print("sweeps: ok")
+
+	# Compare the liquidity curves with the sweeps over a grid of qties.
+	for i in range(50):
+		levels = int(rng.integers(1, 20))
+		ask_p = 100.0 + numpy.cumsum(rng.integers(1, 5, levels) * 0.5)
+		bid_p = 100.0 - numpy.cumsum(rng.integers(1, 5, levels) * 0.5)
+		ask_q = rng.integers(1, 8, levels) * 0.25
+		bid_q = rng.integers(1, 8, levels) * 0.25
+		exchange.update(300 + i, ask_p.tolist(), ask_q.tolist(), bid_p.tolist(), bid_q.tolist())
+		qtys = numpy.concatenate([numpy.linspace(0.0, 1.2 * ask_q.sum(), 50), 
+			numpy.cumsum(ask_q), numpy.cumsum(bid_q)])
+		for side, check in (("ask", exchange.check_ask_qty), ("bid", exchange.check_bid_qty)):
+			curve = exchange.get_liquidity(side, qtys)
+			for j, base_qty in enumerate(qtys):
+				expected = check(base_qty)
+				assert all(numpy.isclose(item[j], value) for item, value in zip(curve, expected))
+	quote, fees, qty, price = exchange.get_liquidity("ask", [])
+	assert len(quote) == 0
+	print("liquidity: ok")
+
+	# Time the sweeps of a deep book.
+	exchange.update(400, (100.0 + numpy.arange(1000) * 0.01).tolist(), [0.5] * 1000,
+		(99.99 - numpy.arange(1000) * 0.01).tolist(), [0.5] * 1000)
+	timer_start = time.time()
+	for base_qty in rng.random(10000) * 500.0:
+		exchange.check_ask_qty(base_qty)
+	elapsed_time = int( 1000 * ( time.time() - timer_start ) )
+	print("sweeps = 10000, elapsed time = {} [ms]".format(elapsed_time))
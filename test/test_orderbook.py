@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import time
+import numpy
+
+from njord.exchange import Exchange
+from njord.orderbook import OrderBook
+
+
+if __name__ == "__main__":
+
+	# Place resting orders, by price then time priority.
+	book = OrderBook()
+	a = book.add("bid", 2.0, 99.5)
+	b = book.add("bid", 1.0, 99.5)
+	c = book.add("bid", 1.0, 99.0)
+	d = book.add("ask", 1.0, 101.0)
+	print(book)
+	assert len(book) == 4 and book.best("bid") == 99.5 and book.best("ask") == 101.0
+	assert book.keys["bid"] == [99.0, 99.5] and book.keys["ask"] == [-101.0]
+
+	# Cancel and replace orders.
+	assert book.cancel(d).id == d and d not in book and book.best("ask") is None
+	assert book.cancel(d) is None
+	book.replace(a, qty=1.5)
+	assert list(book.levels["bid"][99.5]) == [book.orders[a], book.orders[b]]
+	book.replace(a, qty=3.0)
+	assert list(book.levels["bid"][99.5]) == [book.orders[b], book.orders[a]]
+	book.replace(b, price=99.0)
+	assert list(book.levels["bid"][99.0]) == [book.orders[c], book.orders[b]]
+
+	# Match the resting bids against asks with a cumulative depth.
+	fills = book.match("bid", numpy.array([98.5, 99.5]), numpy.array([3.5, 5.0]))
+	assert fills == [(a, 99.5, 3.0, 0.0), (c, 99.0, 0.5, 0.5)]
+	assert book.crosses("bid", 99.0) and not book.crosses("bid", 99.5)
+	assert book.match("bid", numpy.array([99.5]), numpy.array([10.0])) == []
+	print("orderbook: ok")
+
+	# Place limit orders on an exchange.
+	exchange = Exchange("kraken", "BTCEUR", 10.0, 10000.0, fees_window=30)
+	exchange.update(0, [101.0, 102.0, 103.0], [1.0, 1.0, 1.0],
+		[100.0, 99.0, 98.0], [1.0, 1.0, 1.0])
+	a = exchange.place_limit("buy", 2.0, 99.5)
+	b = exchange.place_limit("buy", 1.0, 99.5)
+	c = exchange.place_limit("buy", 2.5, 102.0)
+	assert exchange.wallet_base.qty == 12.0 and len(exchange.book) == 3
+	assert exchange.book.orders[c].qty == 0.5
+	assert exchange.cancel_order(c) and not exchange.cancel_order(c)
+
+	# Match the resting orders at the updates of the orderbook.
+	exchange.update(1, [99.5, 100.0], [2.5, 5.0], [99.0, 98.0], [1.0, 1.0])
+	assert a not in exchange.book and exchange.book.orders[b].qty == 0.5
+	assert exchange.replace_order(b, base_qty=1.0)
+	exchange.apply_deltas(2, "bid", [99.0], [0.0])
+	assert exchange.book.orders[b].qty == 1.0 and exchange.wallet_base.qty == 14.5
+
+	# Match the consumed levels only once they change.
+	exchange.apply_deltas(3, "ask", [99.5], [2.0])
+	assert b not in exchange.book and exchange.wallet_base.qty == 15.5
+	d = exchange.place_limit("buy", 1.0, 99.0)
+	exchange.apply_deltas(4, "bid", [98.0], [5.0])
+	assert d in exchange.book
+	exchange.apply_deltas(5, "ask", [99.5, 99.0], [0.0, 1.0])
+	assert d not in exchange.book and exchange.wallet_base.qty == 16.5
+	print(exchange.trades)
+
+	# Lock the funds of the resting orders.
+	exchange = Exchange("kraken", "BTCEUR", 1.0, 600.0, fees_window=30)
+	exchange.update(0, [101.0], [10.0], [98.0], [10.0])
+	a = exchange.place_limit("buy", 5.0, 99.0)
+	assert numpy.isclose(exchange.wallet_quote.locked, 5.0 * 99.0 * ( 1 + exchange.fees ))
+	assert exchange.place_limit("buy", 5.0, 99.0) is None
+	assert not exchange.replace_order(a, base_qty=11.0)
+	assert exchange.replace_order(a, base_qty=2.0)
+	b = exchange.place_limit("buy", 3.0, 99.0)
+	assert exchange.cancel_order(b)
+	assert numpy.isclose(exchange.wallet_quote.locked, 2.0 * 99.0 * ( 1 + exchange.fees ))
+	c = exchange.place_limit("sell", 0.8, 110.0)
+	assert exchange.place_limit("sell", 0.5, 110.0) is None
+	exchange.sell_market(0.5)
+	assert exchange.wallet_base.qty == 1.0 and exchange.wallet_base.locked == 0.8
+
+	# Release the funds of the filled orders.
+	exchange.update(1, [99.0], [10.0], [110.0], [10.0])
+	assert a not in exchange.book and c not in exchange.book
+	assert exchange.wallet_quote.locked == 0.0 and exchange.wallet_base.locked == 0.0
+	assert exchange.wallet_base.qty == 2.2
+	print(exchange.wallet_quote)
+
+	# Time the matching of level deltas that do not cross the resting orders.
+	exchange.place_limit("buy", 1.0, 90.0)
+	timer_start = time.time()
+	for i in range(10000):
+		exchange.apply_deltas(6 + i, "ask", [100.0 + (i % 50)], [1.0 + (i % 3)])
+	elapsed_time = int( 1000 * ( time.time() - timer_start ) )
+	print("deltas = 10000, elapsed time = {} [ms]".format(elapsed_time))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import time
+import numpy
+import pandas
+
+from njord.prometheus import Prometheus
+
+
+if __name__ == "__main__":
+
+	# Create a random root.
+	rng = numpy.random.default_rng(0)
+	length = 1000
+	root = pandas.DataFrame({
+		"time": pandas.date_range("2020-01-01", periods=length, freq="min"),
+		"price_avg_#t": 150.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"price_low_#t": 140.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"volume": 10.0 + rng.random(length)})
+	root.loc[500, "volume"] = numpy.nan
+
+	# Compare the array and pandas engines.
+	for method, ref in (("pct_change", "price_avg"), ("pct_change", None),
+		("pvt_change", "price_avg"), ("log_change", "price_avg"), (None, None)):
+		for future in (1, 3):
+
+			# Set the prometheus.
+			prometheus = Prometheus()
+			prometheus.set_root(root)
+			prometheus.set_past(6)
+			prometheus.set_future(future)
+			prometheus.set_target("price_avg")
+			prometheus.set_features()
+			prometheus.set_norm(method, ref)
+
+			# Build the timeseries with both engines.
+			timer_start = time.time()
+			prometheus.set_timeseries(engine="array")
+			elapsed_time = int( 1000 * ( time.time() - timer_start ) )
+			timeseries = prometheus.timeseries
+			X, Y = prometheus.get_dataset()
+			prometheus.set_timeseries(engine="pandas")
+			assert timeseries.index.equals(prometheus.timeseries.index)
+			assert numpy.allclose(timeseries.values,
+				prometheus.timeseries.loc[:,timeseries.columns].values)
+			X_pandas, Y_pandas = prometheus.get_dataset()
+			assert numpy.allclose(X, X_pandas) and numpy.allclose(Y, Y_pandas)
+			print("method = {}, future = {}, X = {}, Y = {}, elapsed time = {} [ms]".format(
+				method, future, X.shape, Y.shape, elapsed_time))
+
+	# Fit the standardisation statistics by chunks.
+	prometheus.set_norm("pct_change", "price_avg")
+	prometheus.set_timeseries()
+	X, Y = prometheus.get_dataset()
+	for i in range(0, len(X), 300):
+		prometheus.partial_fit(X[i:i+300], Y[i:i+300])
+	for name, data in (("features", X), ("targets", Y)):
+		moments = prometheus.scaler[name]
+		data = data.reshape(-1, data.shape[-1])
+		std = numpy.sqrt(numpy.asarray(moments["m2"]) / moments["count"])
+		assert moments["count"] == len(data)
+		assert numpy.allclose(moments["mean"], data.mean(axis=0))
+		assert numpy.allclose(std, data.std(axis=0))
+
+	# Fit the statistics over the root, in a single pass of chunks.
+	prometheus.fit(targets=True, chunksize=128)
+	scaler = prometheus.scaler
+	assert scaler["features"]["count"] == X.shape[0] * X.shape[1]
+	assert numpy.allclose(scaler["features"]["mean"],
+		X.reshape(-1, X.shape[-1]).mean(axis=0))
+
+	# Standardise the dataset.
+	prometheus.set_timeseries()
+	X_std, Y_std = prometheus.get_dataset()
+	X_std = X_std.reshape(-1, X_std.shape[-1])
+	assert numpy.allclose(X_std.mean(axis=0), 0.0, atol=1.0E-6)
+	assert numpy.allclose(X_std.std(axis=0), 1.0, atol=1.0E-6)
+	assert numpy.allclose(Y_std.mean(), 0.0, atol=1.0E-6)
+
+	# Set the statistics on a new prometheus.
+	other = Prometheus()
+	other.set_root(root)
+	other.set_attr(prometheus.get_attr())
+	assert other.scaler == scaler
+	other.set_timeseries()
+	X_other, Y_other = other.get_dataset()
+	assert numpy.allclose(X_other.reshape(-1, X_other.shape[-1]), X_std)
+	print("standardisation: ok")
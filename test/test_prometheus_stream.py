@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import time
+import numpy
+import pandas
+
+from njord.prometheus import Prometheus, PrometheusStream
+
+
+if __name__ == "__main__":
+
+	# Create a random root.
+	rng = numpy.random.default_rng(0)
+	length = 300
+	root = pandas.DataFrame({
+		"time": pandas.date_range("2020-01-01", periods=length, freq="min"),
+		"price_avg_#t": 150.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"price_low_#t": 140.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"volume": 10.0 + rng.random(length)})
+
+	# Compare the streamed features with the dataset features.
+	for method, ref in (("pct_change", "price_avg"), ("pvt_change", "price_avg"),
+		("log_change", None), (None, None)):
+
+		# Set the prometheus.
+		prometheus = Prometheus()
+		prometheus.set_root(root)
+		prometheus.set_past(7)
+		prometheus.set_future(2)
+		prometheus.set_target("price_avg")
+		prometheus.set_features()
+		prometheus.set_norm(method, ref)
+		prometheus.set_timeseries()
+		index = prometheus.timeseries.index
+		X, Y = prometheus.get_dataset()
+
+		# Stream the rows of the root.
+		stream = PrometheusStream(prometheus.get_attr())
+		timer_start = time.time()
+		features = {}
+		for t, row in prometheus.root.iterrows():
+			data = stream.append(row)
+			if data is not None:
+				features[t] = data
+		elapsed_time = int( 1000 * ( time.time() - timer_start ) )
+		X_stream = numpy.stack([features[t] for t in index])
+		assert numpy.allclose(X_stream, X)
+		print("method = {}, X = {}, elapsed time = {} [ms]".format(
+			method, X_stream.shape, elapsed_time))
+
+	# Stream rows with more columns than the features, in float32.
+	columns = list(prometheus.root.columns)[::-1] + ["other"]
+	stream = PrometheusStream(prometheus.get_attr(), columns=columns, dtype=numpy.float32)
+	for t, row in prometheus.root.iterrows():
+		data = stream.append(numpy.append(row[columns[:-1]].values, 0.0))
+	assert data.dtype == numpy.float32 and numpy.allclose(data, features[t])
+	print(stream)
+
+	# Check the missing features are reported.
+	try:
+		prometheus.set_root(root.drop(columns=["volume"]))
+		raise AssertionError("missing root features")
+	except ValueError as error:
+		print(error)
+	try:
+		PrometheusStream(prometheus.get_attr(), columns=columns[1:])
+		raise AssertionError("missing stream columns")
+	except ValueError as error:
+		print(error)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+import time
+import numpy
+import pandas
+import pickle
+import shutil
+import tempfile
+
+from njord import ShardDataset
+from njord.prometheus import Prometheus
+
+
+if __name__ == "__main__":
+
+	# Create a random root.
+	rng = numpy.random.default_rng(0)
+	length = 2000
+	root = pandas.DataFrame({
+		"time": pandas.date_range("2020-01-01", periods=length, freq="min"),
+		"price_avg_#t": 150.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"price_low_#t": 140.0 + rng.normal(0.0, 1.0, length).cumsum(),
+		"volume": 10.0 + rng.random(length)})
+
+	# Set the prometheus.
+	prometheus = Prometheus()
+	prometheus.set_root(root)
+	prometheus.set_past(9)
+	prometheus.set_future(3)
+	prometheus.set_target("price_avg")
+	prometheus.set_features()
+	prometheus.set_norm("pct_change", "price_avg")
+	prometheus.set_timeseries()
+	X, Y = prometheus.get_dataset(dtype=numpy.float32)
+
+	# Export the dataset by chunks to shards.
+	directory = tempfile.mkdtemp(prefix="njord_")
+	timer_start = time.time()
+	manifest = prometheus.export(directory, chunksize=333, shardsize=250,
+		dtype=numpy.float32)
+	elapsed_time = int( 1000 * ( time.time() - timer_start ) )
+	print("shards = {}, length = {}, elapsed time = {} [ms]".format(
+		len(manifest["shards"]), manifest["length"], elapsed_time))
+
+	# Read the shards back.
+	dataset = ShardDataset(directory)
+	print(dataset)
+	assert len(dataset) == len(X)
+	X_shard = numpy.stack([dataset[i][0] for i in range(len(dataset))])
+	Y_shard = numpy.stack([dataset[i][1] for i in range(len(dataset))])
+	assert numpy.array_equal(X_shard, X) and numpy.array_equal(Y_shard, Y)
+
+	# Check the mini-batches cover each sample once.
+	seen = []
+	for X_batch, Y_batch in dataset.batches(64, seed=1):
+		assert len(X_batch) == 64 or sum(len(item) for item in seen) + len(X_batch) == len(X)
+		seen.append(X_batch)
+	seen = numpy.concatenate(seen).reshape(len(X), -1)
+	assert numpy.array_equal(numpy.unique(seen, axis=0), 
+		numpy.unique(X.reshape(len(X), -1), axis=0))
+	n = sum(len(X_batch) for X_batch, Y_batch in dataset.batches(64, drop_last=True))
+	assert n == len(X) // 64 * 64
+
+	# Check the dataset can be sent to a worker process.
+	assert len(pickle.loads(pickle.dumps(dataset))) == len(dataset)
+	print("batches: ok")
+
+	# Remove the shards.
+	shutil.rmtree(directory)
@@ -2,6 +2,7 @@
 # coding=utf-8
 
 import time
+import numpy
 import random
 import datetime
 
@@ -42,4 +43,13 @@ if __name__ == "__main__":
 	# Compute the elapsed time and display.
 	elapsed_time = int( 1000 * ( timer_final - timer_start ) )
 	print("Elapsed time = {} [ms]".format(elapsed_time))
+
+	# Append the rows of a reused buffer.
+	window = Window(lookback=5, backend="numpy")
+	row = numpy.empty(2)
+	for i in range(6):
+		row[:] = [i, 2 * i]
+		window.append_array(row, columns=["price_avg_#t", "price_low_#t"] if i == 0 else None)
+	assert [list(x) for x in window.root] == [[i, 2 * i] for i in range(6)]
+	print(window())
 	time.sleep(1.0)
\ No newline at end of file